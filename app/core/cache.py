@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Hashable, Optional
+
+from .config import settings
+
+_MISSING = object()
+
+class TTLCache:
+    # A loader that races with an invalidation must not store what it read
+    # before the write committed. It reads generation(key) before querying
+    # and passes it to set(), which drops the value if the key was
+    # invalidated (or the cache cleared) in between. generation() without a
+    # key moves on every invalidation, for loaders that fill many keys.
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # Invalidations per key since the last fold; only invalidated keys
+        # have an entry. _fold() moves them into _base so that every
+        # generation still moves forward while the counter stays bounded.
+        self._generations: Counter = Counter()
+        self._base = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def generation(self, key: Optional[Hashable] = None) -> int:
+        with self._lock:
+            if key is None:
+                return self._invalidations
+            return self._base + self._generations[key]
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+
+    def _evict(self) -> None:
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> bool:
+        # Returns whether the value was stored
+        with self._lock:
+            if generation is not None and generation != self._base + self._generations[key]:
+                return False
+            self._store(key, value)
+            self._evict()
+            return True
+
+    def set_many(self, values: dict, generation: Optional[int] = None) -> bool:
+        # generation is generation() without a key: any invalidation since
+        # it was read drops the whole batch
+        with self._lock:
+            if generation is not None and generation != self._invalidations:
+                return False
+            for key, value in values.items():
+                self._store(key, value)
+            self._evict()
+            return True
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._generations[key] += 1
+            self._invalidations += 1
+            if len(self._generations) > self.maxsize:
+                self._fold()
+
+    def _fold(self) -> None:
+        self._base += max(self._generations.values(), default=0) + 1
+        self._generations.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._fold()
+            self._invalidations += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+# role_id -> RolePermissions(version, names)
+permission_cache = TTLCache(
+    maxsize=settings.PERMISSION_CACHE_MAXSIZE,
+    ttl=settings.PERMISSION_CACHE_TTL_SECONDS,
+)
+
+# user_id -> User.token_version, or None once the user is gone
+token_version_cache = TTLCache(
+    maxsize=settings.PERMISSION_CACHE_MAXSIZE,
+    ttl=settings.PERMISSION_CACHE_TTL_SECONDS,
+)
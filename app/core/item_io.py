@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import IO, Iterator, Literal, Optional
+
+from pydantic import ValidationError
+
+from app.schemas.item import ItemCreate, ItemImportError
+
+ItemFileFormat = Literal["csv", "ndjson"]
+
+# (row number, record, parse error)
+RawRecord = tuple[int, Optional[dict], Optional[str]]
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> ItemFileFormat:
+    filename = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return "csv"
+
+def _iter_csv(stream: IO[str]) -> Iterator[RawRecord]:
+    reader = csv.DictReader(stream)
+    for row_number, record in enumerate(reader, start=1):
+        if None in record:
+            yield row_number, None, "too many columns"
+            continue
+        yield row_number, record, None
+
+def _iter_ndjson(stream: IO[str]) -> Iterator[RawRecord]:
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row_number, None, f"invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "expected a JSON object"
+            continue
+        yield row_number, record, None
+
+def iter_records(stream: IO[str], file_format: ItemFileFormat) -> Iterator[RawRecord]:
+    if file_format == "ndjson":
+        return _iter_ndjson(stream)
+    return _iter_csv(stream)
+
+def read_batch(
+    records: Iterator[RawRecord], size: int
+) -> tuple[int, list[tuple[int, ItemCreate]], list[ItemImportError]]:
+    seen = 0
+    valid: list[tuple[int, ItemCreate]] = []
+    errors: list[ItemImportError] = []
+
+    for row_number, record, error in islice(records, size):
+        seen += 1
+        if error is not None:
+            errors.append(ItemImportError(row=row_number, errors=[error]))
+            continue
+
+        # items.description is NOT NULL; treat a missing value as empty
+        if not record.get("description"):
+            record["description"] = ""
+
+        try:
+            item = ItemCreate.model_validate(record)
+        except ValidationError as exc:
+            errors.append(ItemImportError(
+                row=row_number,
+                errors=[
+                    f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+                    for e in exc.errors()
+                ],
+            ))
+            continue
+
+        valid.append((row_number, item))
+
+    return seen, valid, errors
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def csv_header(columns) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue()
+
+def encode_rows(rows, file_format: ItemFileFormat) -> str:
+    if file_format == "ndjson":
+        return "".join(
+            json.dumps(row._asdict(), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
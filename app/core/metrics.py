@@ -0,0 +1,111 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+class QueryStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+# Set by the metrics middleware for the duration of a request. Threadpool
+# and run_sync calls see the same object, so their statements count too.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: dict[tuple, int] = {}
+        self.latency: dict[tuple, Histogram] = {}
+        self.statements: dict[tuple, Histogram] = {}
+        self.db_seconds: dict[tuple, float] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, query_stats: QueryStats) -> None:
+        labels = (method, route)
+        with self._lock:
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault(labels, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.statements.setdefault(labels, Histogram(STATEMENT_BUCKETS)).observe(query_stats.statements)
+            self.db_seconds[labels] = self.db_seconds.get(labels, 0.0) + query_stats.db_seconds
+
+    def render(self) -> str:
+        # Prometheus text exposition format, version 0.0.4
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP http_requests_total Requests by method, route template and status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), value in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {value}")
+
+            lines += _render_histogram(
+                "http_request_duration_seconds", "Time until the response started, per route.", self.latency
+            )
+            lines += _render_histogram(
+                "db_statements_per_request", "SQL statements executed per request, per route.", self.statements
+            )
+
+            lines += [
+                "# HELP db_time_seconds_total Time spent executing SQL statements, per route.",
+                "# TYPE db_time_seconds_total counter",
+            ]
+            for (method, route), value in sorted(self.db_seconds.items()):
+                lines.append(f"db_time_seconds_total{_labels(method=method, route=route)} {value:.6f}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+def _render_histogram(name: str, help_text: str, histograms: dict) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.total:.6f}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {cumulative}")
+    return lines
+
+request_metrics = RequestMetrics()
+
+def install_query_metrics(engine: Engine) -> None:
+    # Attribute each statement and its execution time to the current request
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_query_stats.get() is not None:
+            conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_query_stats.get()
+        if stats is None:
+            return
+        started = conn.info.get("query_started_at")
+        if started:
+            stats.db_seconds += time.perf_counter() - started.pop()
+        stats.statements += 1
@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import Counter
+from typing import NamedTuple, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .cache import TTLCache
+from .config import settings
+from .responses import json_response, page_response
+
+logger = logging.getLogger(__name__)
+
+class CachedResponse(NamedTuple):
+    etag: Optional[str]
+    body: bytes
+
+class CacheLookup(NamedTuple):
+    # key carries the namespace generation seen before the page was read, so
+    # a page built from pre-write rows is stored under the old generation,
+    # where nothing reads it, and never under the new one
+    key: Optional[str]
+    cached: Optional[CachedResponse]
+
+class MemoryBackend:
+    # Per-process LRU + TTL. Invalidation only reaches this process, so with
+    # several workers the others serve stale pages for up to the TTL.
+    blocking = False
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self._entries.set(key, value)
+
+    def generation(self, namespace: str) -> int:
+        return self._generations[namespace]
+
+    def bump(self, namespace: str) -> None:
+        with self._lock:
+            self._generations[namespace] += 1
+
+class RedisBackend:
+    # Any client speaking the redis-py API (get/set/incr), e.g. redis.Redis
+    # or a local stand-in such as fakeredis. Generations live in the store,
+    # so an invalidation is seen by every worker.
+    blocking = True
+
+    def __init__(self, client, ttl: float, prefix: str = "response-cache"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl: float):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package") from exc
+        return cls(redis.Redis.from_url(url), ttl)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(f"{self.prefix}:{key}")
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(f"{self.prefix}:{key}", value, ex=max(int(self.ttl), 1))
+
+    def generation(self, namespace: str) -> int:
+        return int(self.client.get(f"{self.prefix}:generation:{namespace}") or 0)
+
+    def bump(self, namespace: str) -> None:
+        self.client.incr(f"{self.prefix}:generation:{namespace}")
+
+class ResponseCache:
+    # Serialized list/search responses, keyed by namespace (one per resource),
+    # the route's normalized params and the caller's owner scope. Writes
+    # invalidate a namespace by bumping its generation, which is part of every
+    # key, so stale entries are never read again and simply age out.
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._hits: Counter = Counter()
+        self._misses: Counter = Counter()
+        self._pending: list = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _key(self, namespace: str, params: dict) -> str:
+        normalized = repr(sorted(params.items()))
+        digest = hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+        return f"{namespace}:{self.backend.generation(namespace)}:{digest}"
+
+    def _get(self, namespace: str, params: dict) -> CacheLookup:
+        key = self._key(namespace, params)
+        value = self.backend.get(key)
+        if value is None:
+            self._misses[namespace] += 1
+            return CacheLookup(key, None)
+
+        self._hits[namespace] += 1
+        etag, _, body = value.partition(b"\n")
+        return CacheLookup(key, CachedResponse(etag=etag.decode() or None, body=body))
+
+    def _set(self, key: str, etag: Optional[str], body: bytes) -> None:
+        self.backend.set(key, (etag or "").encode() + b"\n" + body)
+
+    async def get(self, namespace: str, params: dict) -> CacheLookup:
+        if self.backend is None:
+            return CacheLookup(None, None)
+        await self.flush()
+        if self.backend.blocking:
+            return await run_in_threadpool(self._get, namespace, params)
+        return self._get(namespace, params)
+
+    async def set(self, lookup: CacheLookup, etag: Optional[str], body: bytes) -> None:
+        if self.backend is None or lookup.key is None:
+            return
+        if self.backend.blocking:
+            await run_in_threadpool(self._set, lookup.key, etag, body)
+        else:
+            self._set(lookup.key, etag, body)
+
+    def _bump(self, namespaces: tuple) -> None:
+        for namespace in namespaces:
+            self.backend.bump(namespace)
+
+    def invalidate(self, *namespaces: str) -> None:
+        # Called from CRUD functions after they commit
+        if self.backend is None:
+            return
+        if self.backend.blocking and _on_event_loop():
+            # Async mode runs CRUD through run_sync on the event loop thread;
+            # make the round trip in a thread and let run_db await it
+            self._pending.append(asyncio.get_running_loop().run_in_executor(None, self._bump, namespaces))
+            return
+        self._bump(namespaces)
+
+    async def flush(self) -> None:
+        # Wait for deferred invalidations, so none is outstanding when a write
+        # returns or a lookup reads a generation
+        while self._pending:
+            pending, self._pending = self._pending, []
+            for result in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.warning("Response cache invalidation failed", exc_info=result)
+
+    def stats(self) -> list[dict]:
+        namespaces = sorted(set(self._hits) | set(self._misses))
+        return [
+            {"namespace": namespace, "hits": self._hits[namespace], "misses": self._misses[namespace]}
+            for namespace in namespaces
+        ]
+
+async def cached_page(lookup: CacheLookup, page, etag: Optional[str] = None):
+    # Store a freshly built page and answer with the same bytes, so a miss
+    # serializes once
+    if not response_cache.enabled:
+        return page_response(page, etag)
+
+    body = page.__pydantic_serializer__.to_json(page)
+    await response_cache.set(lookup, etag, body)
+    return json_response(body, etag)
+
+def cached_response(cached: CachedResponse):
+    return json_response(cached.body, cached.etag)
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+def _create_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryBackend(maxsize=settings.RESPONSE_CACHE_MAXSIZE, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend.from_url(settings.RESPONSE_CACHE_REDIS_URL, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+    return None
+
+response_cache = ResponseCache(_create_backend())
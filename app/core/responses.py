@@ -0,0 +1,30 @@
+from typing import Optional
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from .config import settings
+
+def default_response_class():
+    if not settings.FAST_JSON_RESPONSES:
+        return JSONResponse
+    try:
+        import orjson  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("FAST_JSON_RESPONSES requires the orjson package") from exc
+
+    from fastapi.responses import ORJSONResponse
+    return ORJSONResponse
+
+def json_response(body: bytes, etag: Optional[str] = None) -> Response:
+    headers = {"ETag": etag} if etag else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def page_response(page, etag: Optional[str] = None):
+    # Fast path for list pages: the page model was already validated when it
+    # was built, so pydantic-core writes it to JSON bytes directly instead of
+    # FastAPI re-checking it against response_model, converting it to Python
+    # objects and encoding those with the stdlib json module.
+    if not settings.FAST_JSON_RESPONSES:
+        return page
+    return json_response(page.__pydantic_serializer__.to_json(page), etag)
@@ -1,28 +1,89 @@
 from datetime import datetime as dt, timedelta
 import datetime
-from typing import Any, Union
-from jose import jwt
+from typing import Any, Iterable, Optional, Union
+from jose import JWTError, jwt
 from .config import settings
+from .worker_pool import BoundedExecutor
 
 import bcrypt
 
-def create_access_token(subject: Union[str, Any], role: str) -> str:
+def create_access_token(
+    subject: Union[str, Any],
+    role: str,
+    user_id: Optional[int] = None,
+    role_id: Optional[int] = None,
+    permissions: Optional[Iterable[str]] = None,
+    permissions_version: Optional[int] = None,
+    token_version: Optional[int] = None,
+) -> str:
     expire = dt.now(datetime.timezone.utc) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
     to_encode = {"exp": expire, "sub": str(subject), "role": role}
+
+    if (
+        settings.ACCESS_TOKEN_EMBED_PERMISSIONS
+        and user_id is not None
+        and role_id is not None
+        and permissions_version is not None
+        and token_version is not None
+    ):
+        to_encode.update({
+            "uid": user_id,
+            "rid": role_id,
+            "perms": sorted(permissions or ()),
+            "pv": permissions_version,
+            "tv": token_version,
+        })
+
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def token_subject(token: str) -> Optional[str]:
+    # The subject of a valid access token, or None
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+# bcrypt is CPU bound; keep it off the request threads and event loop, and
+# reject work (PoolSaturated -> 503) instead of queueing without bound.
+password_pool = BoundedExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    name="password-hash",
+)
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         plain_password.encode("utf-8"),
         hashed_password.encode("utf-8"),
     )
 
-def get_password_hash(password: str) -> str:
+def _hashpw(password: str, rounds: int) -> str:
     pwd_bytes = password.encode("utf-8")
 
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds)
     hashed_pass = bcrypt.hashpw(pwd_bytes, salt)
-    return hashed_pass.decode("utf-8")
\ No newline at end of file
+    return hashed_pass.decode("utf-8")
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_pool.run(_checkpw, plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    return password_pool.run(_hashpw, password, settings.BCRYPT_ROUNDS)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run_async(_checkpw, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run_async(_hashpw, password, settings.BCRYPT_ROUNDS)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    # bcrypt hashes look like $2b$<cost>$<salt+digest>
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return False
+    return rounds != settings.BCRYPT_ROUNDS
\ No newline at end of file
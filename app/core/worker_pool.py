@@ -0,0 +1,74 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Literal, Optional
+
+class PoolSaturated(Exception):
+    pass
+
+class BoundedExecutor:
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        kind: Literal["thread", "process"] = "thread",
+        name: str = "worker",
+    ):
+        self.max_workers = max_workers
+        # Submissions beyond the workers plus this many queued jobs are rejected
+        self.max_pending = max_pending
+        self.kind = kind
+        self.name = name
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers, thread_name_prefix=self.name
+                        )
+        return self._executor
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def submit(self, fn: Callable, *args) -> Future:
+        executor = self._get_executor()
+
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_pending:
+                raise PoolSaturated(f"{self.name} pool is saturated")
+            self._in_flight += 1
+
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn: Callable, *args):
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -1,54 +1,111 @@
 from sqlalchemy.orm import Session
 from app.models.item import Item
 from app.schemas.item import ItemCreate, ItemUpdate
-from sqlalchemy import or_
+from app.crud.pagination import CountMode, paginate
+from app.crud.search import contains
+from app.crud.stock_movement import log_movements
+from app.core.response_cache import response_cache
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 
-def get_items(db: Session, skip: int = 0, limit: int = 100, search: str = None):
-    query = db.query(Item)
+# The columns of the Item schema. List pages and exports select these as
+# plain rows instead of hydrating ORM instances, which skips the identity
+# map, instance state and relationship bookkeeping per row. List pages add
+# the version, which their ETag is computed from.
+ITEM_COLUMNS = (Item.id, Item.name, Item.description, Item.sku, Item.quantity, Item.owner_id)
+ITEM_PAGE_COLUMNS = (*ITEM_COLUMNS, Item.version)
 
-    if search:
-        query = query.filter(or_(Item.name.ilike(f"%{search}%"), Item.sku.ilike(f"%{search}%")))
+def _items_query(db: Session, search: str = None, user_id: int = None, columns: tuple = (Item,)):
+    query = db.query(*columns)
+
+    if user_id is not None:
+        query = query.filter(Item.owner_id == user_id)
 
-    return query.order_by(Item.id.desc()).offset(skip).limit(limit).all()
+    if search:
+        query = query.filter(contains(search, Item.name, Item.sku))
 
-def get_user_items(db: Session, user_id: int, skip: int = 0, limit: int = 100, search: str = None):
-    query = db.query(Item).filter(Item.owner_id == user_id)
+    return query
 
+def export_items_statement(search: str = None, user_id: int = None):
+    stmt = select(*ITEM_COLUMNS)
+    if user_id is not None:
+        stmt = stmt.where(Item.owner_id == user_id)
     if search:
-        query = query.filter(or_(Item.name.ilike(f"%{search}%"), Item.sku.ilike(f"%{search}%")))
+        stmt = stmt.where(contains(search, Item.name, Item.sku))
+    return stmt.order_by(Item.id)
+
+# List functions return dicts keyed by ITEM_PAGE_COLUMNS names
+def get_items(db: Session, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None):
+    query = _items_query(db, search, columns=ITEM_PAGE_COLUMNS)
+    items, _ = paginate(query, Item.id, skip=skip, limit=limit, cursor=cursor, count="none")
+    return items
+
+def get_user_items(db: Session, user_id: int, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None):
+    query = _items_query(db, search, user_id, columns=ITEM_PAGE_COLUMNS)
+    items, _ = paginate(query, Item.id, skip=skip, limit=limit, cursor=cursor, count="none")
+    return items
 
-    return query.order_by(Item.id.desc()).offset(skip).limit(limit).all()
+def get_items_page(db: Session, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None, count: CountMode = None):
+    query = _items_query(db, search, columns=ITEM_PAGE_COLUMNS)
+    return paginate(query, Item.id, skip=skip, limit=limit, cursor=cursor, count=count)
+
+def get_user_items_page(db: Session, user_id: int, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None, count: CountMode = None):
+    query = _items_query(db, search, user_id, columns=ITEM_PAGE_COLUMNS)
+    return paginate(query, Item.id, skip=skip, limit=limit, cursor=cursor, count=count)
 
 def get_total_items(db: Session, search: str = None):
-    query = db.query(Item)
-    if search:
-        query = query.filter(or_(Item.name.ilike(f"%{search}%"), Item.sku.ilike(f"%{search}%")))
-    return query.count()
+    return _items_query(db, search).count()
 
 def get_user_total_items(db: Session, user_id: int, search: str = None):
-    query = db.query(Item).filter(Item.owner_id == user_id)
-    if search:
-        query = query.filter(or_(Item.name.ilike(f"%{search}%"), Item.sku.ilike(f"%{search}%")))
-    return query.count()
+    return _items_query(db, search, user_id).count()
 
 def get_item(db: Session, item_id: int):
     return db.query(Item).filter(Item.id == item_id).first()
 
+def get_item_owners(db: Session, item_ids: list[int]) -> dict[int, int]:
+    return dict(db.query(Item.id, Item.owner_id).filter(Item.id.in_(item_ids)).all())
+
 def create_item(db: Session, item: ItemCreate, user_id: int):
     db_item = Item(**item.model_dump(), owner_id=user_id)
     db.add(db_item)
+    if db_item.quantity:
+        db.flush()
+        log_movements(db, [{
+            "item_id": db_item.id,
+            "sku": db_item.sku,
+            "delta": db_item.quantity,
+            "quantity_after": db_item.quantity,
+            "reason": "initial stock",
+            "created_by": user_id,
+        }])
     db.commit()
+    response_cache.invalidate("items")
     db.refresh(db_item)
     return db_item
 
-def update_item(db: Session, item_id: int, item: ItemUpdate):
-    query = db.query(Item).filter(Item.id == item_id)
+def update_item(db: Session, item_id: int, item: ItemUpdate, user_id: int = None):
+    # Lock the row so no adjustment lands between reading the previous
+    # quantity and writing the new one; the logged delta must match.
+    # populate_existing refreshes an instance the route already loaded.
+    query = db.query(Item).filter(Item.id == item_id).with_for_update().populate_existing()
 
     db_item = query.first()
     if db_item:
+        previous_quantity = db_item.quantity or 0
         for key, value in item.model_dump(exclude_unset=True).items():
             setattr(db_item, key, value)
+        db_item.version = Item.version + 1
+        if db_item.quantity is not None and db_item.quantity != previous_quantity:
+            log_movements(db, [{
+                "item_id": db_item.id,
+                "sku": db_item.sku,
+                "delta": db_item.quantity - previous_quantity,
+                "quantity_after": db_item.quantity,
+                "reason": "manual update",
+                "created_by": user_id,
+            }])
         db.commit()
+        response_cache.invalidate("items")
         db.refresh(db_item)
         
     return db_item
@@ -60,4 +117,62 @@ def delete_item(db: Session, item_id: int):
     if db_item:
         db.delete(db_item)
         db.commit()
-    return db_item
\ No newline at end of file
+        response_cache.invalidate("items")
+    return db_item
+
+def upsert_items(db: Session, items: list[ItemCreate], owner_id: int, restrict_to_owner: bool = True) -> set[str]:
+    # Returns the SKUs actually written; with restrict_to_owner a SKU that
+    # belongs to another user is left untouched and missing from the result.
+    # Every quantity change is logged as a stock movement, which needs the
+    # previous quantity, so a batch takes up to three statements before that:
+    #   1. INSERT ... ON CONFLICT DO NOTHING for new SKUs (previous is 0)
+    #   2. SELECT ... FOR UPDATE the quantities of the SKUs that exist
+    #   3. INSERT ... ON CONFLICT DO UPDATE for those, now that they are locked
+    if not items:
+        return set()
+
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    rows = {item.sku: {**item.model_dump(), "owner_id": owner_id} for item in items}
+    inserted = db.execute(
+        insert(Item).values(list(rows.values()))
+        .on_conflict_do_nothing(index_elements=[Item.sku])
+        .returning(Item.id, Item.sku, Item.quantity)
+    ).all()
+    changes = [(item_id, sku, 0, quantity) for item_id, sku, quantity in inserted]
+
+    for _, sku, _ in inserted:
+        del rows[sku]
+    if rows:
+        previous = dict(
+            db.query(Item.sku, Item.quantity).filter(Item.sku.in_(rows)).with_for_update().all()
+        )
+        stmt = insert(Item).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Item.sku],
+            set_={
+                "name": stmt.excluded.name,
+                "description": stmt.excluded.description,
+                "quantity": stmt.excluded.quantity,
+                "version": Item.version + 1,
+            },
+            where=(Item.owner_id == owner_id) if restrict_to_owner else None,
+        ).returning(Item.id, Item.sku, Item.quantity)
+        changes += [(item_id, sku, previous.get(sku), quantity) for item_id, sku, quantity in db.execute(stmt)]
+
+    log_movements(db, [
+        {
+            "item_id": item_id,
+            "sku": sku,
+            "delta": (after or 0) - (before or 0),
+            "quantity_after": after or 0,
+            "reason": "import",
+            "created_by": owner_id,
+        }
+        for item_id, sku, before, after in changes
+        if (after or 0) != (before or 0)
+    ])
+    db.commit()
+    response_cache.invalidate("items")
+    return {sku for _, sku, _, _ in changes}
@@ -0,0 +1,89 @@
+from typing import Literal, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+CountMode = Literal["exact", "estimate", "none"]
+
+def paginate(
+    query: Query,
+    id_column,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    cursor: Optional[int] = None,
+    count: Optional[CountMode] = None,
+) -> tuple[list, Optional[int]]:
+    # By default offset pages are counted (the window is free) and keyset
+    # seeks are not: a separate COUNT(*) per seek is what cursors avoid
+    if count is None:
+        count = "exact" if cursor is None else "none"
+
+    page_query = query
+    if cursor is not None:
+        page_query = page_query.filter(id_column < cursor)
+
+    page_query = page_query.order_by(id_column.desc())
+    if cursor is None and skip:
+        page_query = page_query.offset(skip)
+    if limit is not None:
+        page_query = page_query.limit(limit)
+
+    # Single-entity queries yield the entity; column queries yield dicts
+    keys = [column["name"] for column in page_query.column_descriptions]
+
+    def unwrap(row):
+        return row[0] if len(keys) == 1 else dict(zip(keys, row))
+
+    # In offset mode the window counts the whole filtered set, so rows and
+    # total come back in one statement. A cursor filter would shrink the
+    # window, so seeks count separately.
+    if count == "exact" and cursor is None:
+        rows = page_query.add_columns(func.count().over()).all()
+        if rows:
+            return [unwrap(row) for row in rows], rows[0][len(keys)]
+        if not skip:
+            return [], 0
+        # Page past the end: nothing to read the window from
+        return [], query.order_by(None).count()
+
+    items = page_query.all()
+    if len(keys) > 1:
+        items = [unwrap(row) for row in items]
+
+    if count == "exact":
+        total = query.order_by(None).count()
+    elif count == "estimate":
+        total = estimate_count(query)
+    else:
+        total = None
+
+    return items, total
+
+def estimate_count(query: Query) -> int:
+    query = query.order_by(None)
+    connection = query.session.connection()
+
+    if connection.dialect.name != "postgresql":
+        return query.count()
+
+    # Planner row estimate: no scan, accuracy depends on ANALYZE statistics
+    compiled = query.statement.compile(
+        dialect=connection.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", driver_params(compiled)
+    ).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def driver_params(compiled):
+    # exec_driver_sql passes parameters straight to the DBAPI: a dict for
+    # named styles (psycopg2), a tuple in placeholder order for positional
+    # ones (asyncpg's $1, $2)
+    if compiled.positional:
+        return tuple(compiled.params[name] for name in compiled.positiontup)
+    return compiled.params
+
+def total_pages(total: Optional[int], limit: int) -> Optional[int]:
+    if total is None:
+        return None
+    return (total + limit - 1) // limit
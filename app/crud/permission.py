@@ -1,19 +1,32 @@
 from sqlalchemy.orm import Session
-from app.models.rbac import Permission
+from app.models.rbac import Permission, Role
 from app.schemas.permission import PermissionCreate, PermissionUpdate
+from app.core.cache import permission_cache
+from app.core.response_cache import response_cache
+from app.crud.pagination import CountMode, paginate
 
 
-def get_permissions(db: Session, skip: int = 0, limit: int = 100, search: str = None):
+def _permissions_query(db: Session, search: str = None):
     query = db.query(Permission)
     if search:
         query = query.filter(Permission.name.ilike(f"%{search}%"))
-    return query.order_by(Permission.id.desc()).offset(skip).limit(limit).all()
+    return query
+
+def get_permissions(db: Session, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None):
+    permissions, _ = paginate(_permissions_query(db, search), Permission.id, skip=skip, limit=limit, cursor=cursor, count="none")
+    return permissions
+
+def get_permissions_page(db: Session, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None, count: CountMode = None):
+    return paginate(_permissions_query(db, search), Permission.id, skip=skip, limit=limit, cursor=cursor, count=count)
 
 def get_total_permissions(db: Session, search: str = None):
-    query = db.query(Permission)
-    if search:
-        query = query.filter(Permission.name.ilike(f"%{search}%"))
-    return query.count()
+    return _permissions_query(db, search).count()
+
+def _bump_roles_permissions_version(db: Session, permission_id: int):
+    db.query(Role).filter(Role.permissions.any(Permission.id == permission_id)).update(
+        {Role.permissions_version: Role.permissions_version + 1, Role.version: Role.version + 1},
+        synchronize_session=False,
+    )
 
 def get_permission(db: Session, permission_id: int):
     return db.query(Permission).filter(Permission.id == permission_id).first()
@@ -22,6 +35,7 @@ def create_permission(db: Session, permission: PermissionCreate):
     db_permission = Permission(**permission.model_dump())
     db.add(db_permission)
     db.commit()
+    response_cache.invalidate("permissions")
     db.refresh(db_permission)
     return db_permission
 
@@ -32,7 +46,11 @@ def update_permission(db: Session, permission_id: int, permission: PermissionUpd
     if db_permission:
         for key, value in permission.model_dump(exclude_unset=True).items():
             setattr(db_permission, key, value)
+        db_permission.version = (db_permission.version or 0) + 1
+        _bump_roles_permissions_version(db, permission_id)
         db.commit()
+        permission_cache.clear()
+        response_cache.invalidate("permissions", "roles", "users")
         db.refresh(db_permission)
     return db_permission
 
@@ -41,6 +59,9 @@ def delete_permission(db: Session, permission_id: int):
 
     db_permission = query.first()
     if db_permission:
+        _bump_roles_permissions_version(db, permission_id)
         db.delete(db_permission)
         db.commit()
+        permission_cache.clear()
+        response_cache.invalidate("permissions", "roles", "users")
     return db_permission
\ No newline at end of file
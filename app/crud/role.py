@@ -1,27 +1,103 @@
-from sqlalchemy.orm import Session, joinedload
-from app.models.rbac import Role, Permission
+from typing import NamedTuple
+from sqlalchemy.orm import Session, selectinload
+from app.models.rbac import Role, Permission, role_permission
 from app.models.user import User
 from app.schemas.role import RoleCreate, RoleUpdate
+from app.core.cache import permission_cache, token_version_cache
+from app.core.response_cache import response_cache
+from app.crud.pagination import CountMode, paginate
+from app.crud.user import bump_token_version
 
-def get_roles(db: Session, skip: int = 0, limit: int = 100, search: str = None):
+def _roles_query(db: Session, search: str = None):
     query = db.query(Role)
     if search:
         query = query.filter(Role.name.ilike(f"%{search}%"))
-    return query.options(joinedload(Role.permissions)).order_by(Role.id.desc()).offset(skip).limit(limit).all()
+    return query
+
+# Permissions come in a second query keyed by the page's role ids.
+# joinedload would wrap the LIMITed role query in a subquery and return
+# roles x permissions rows, one full role row per permission.
+def get_roles(db: Session, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None):
+    query = _roles_query(db, search).options(selectinload(Role.permissions))
+    roles, _ = paginate(query, Role.id, skip=skip, limit=limit, cursor=cursor, count="none")
+    return roles
+
+def get_roles_page(db: Session, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None, count: CountMode = None):
+    query = _roles_query(db, search).options(selectinload(Role.permissions))
+    return paginate(query, Role.id, skip=skip, limit=limit, cursor=cursor, count=count)
 
 def get_total_roles(db: Session, search: str = None):
-    query = db.query(Role)
-    if search:
-        query = query.filter(Role.name.ilike(f"%{search}%"))
-    return query.count()
+    return _roles_query(db, search).count()
+
+class RolePermissions(NamedTuple):
+    version: int | None
+    names: frozenset[str]
+
+def get_role_permissions(db: Session, role_id: int) -> RolePermissions:
+    cached = permission_cache.get(role_id)
+    if cached is not None:
+        return cached
+
+    generation = permission_cache.generation(role_id)
+    rows = (
+        db.query(Role.permissions_version, Permission.name)
+        .outerjoin(role_permission, role_permission.c.role_id == Role.id)
+        .outerjoin(Permission, Permission.id == role_permission.c.permission_id)
+        .filter(Role.id == role_id)
+        .all()
+    )
+    version = rows[0][0] if rows else None
+    role_permissions = RolePermissions(
+        version=version,
+        names=frozenset(name for _, name in rows if name is not None),
+    )
+    permission_cache.set(role_id, role_permissions, generation=generation)
+    return role_permissions
+
+def warm_permission_cache(db: Session) -> int:
+    # Fill the cache for every role with one query, e.g. at startup
+    generation = permission_cache.generation()
+    rows = (
+        db.query(Role.id, Role.permissions_version, Permission.name)
+        .outerjoin(role_permission, role_permission.c.role_id == Role.id)
+        .outerjoin(Permission, Permission.id == role_permission.c.permission_id)
+        .all()
+    )
+    versions = {}
+    names = {}
+    for role_id, version, name in rows:
+        versions[role_id] = version
+        names.setdefault(role_id, set())
+        if name is not None:
+            names[role_id].add(name)
+
+    permission_cache.set_many(
+        {
+            role_id: RolePermissions(version=version, names=frozenset(names[role_id]))
+            for role_id, version in versions.items()
+        },
+        generation=generation,
+    )
+    return len(versions)
+
+def get_role_permission_names(db: Session, role_id: int) -> frozenset[str]:
+    return get_role_permissions(db, role_id).names
+
+def _bump_version(role: Role):
+    role.version = (role.version or 0) + 1
+
+def _bump_permissions_version(role: Role):
+    role.permissions_version = (role.permissions_version or 0) + 1
+    _bump_version(role)
 
 def get_role(db: Session, role_id: int):
-    return db.query(Role).filter(Role.id == role_id).first()
+    return db.query(Role).options(selectinload(Role.permissions)).filter(Role.id == role_id).first()
 
 def create_role(db: Session, role: RoleCreate):
     db_role = Role(**role.model_dump(exclude_unset=True))
     db.add(db_role)
     db.commit()
+    response_cache.invalidate("roles")
     db.refresh(db_role)
     return db_role
 
@@ -30,9 +106,20 @@ def update_role(db: Session, role_id: int, role: RoleUpdate):
 
     db_role = query.first()
     if db_role:
-        for key, value in role.model_dump(exclude_unset=True).items():
+        changes = role.model_dump(exclude_unset=True)
+        # Tokens carry the role name, which decides admin scoping
+        renamed = "name" in changes and changes["name"] != db_role.name
+        for key, value in changes.items():
             setattr(db_role, key, value)
+        if renamed:
+            _bump_permissions_version(db_role)
+        else:
+            _bump_version(db_role)
         db.commit()
+        if renamed:
+            permission_cache.invalidate(role_id)
+        # User pages embed their role
+        response_cache.invalidate("roles", "users")
         db.refresh(db_role)
     return db_role
 
@@ -43,6 +130,8 @@ def delete_role(db: Session, role_id: int):
     if db_role:
         db.delete(db_role)
         db.commit()
+        permission_cache.invalidate(role_id)
+        response_cache.invalidate("roles", "users")
     return db_role
 
 def assign_role(db: Session, user_id: int, role_id: int):
@@ -51,7 +140,10 @@ def assign_role(db: Session, user_id: int, role_id: int):
     db_user = query.first()
     if db_user:
         db_user.role_id = role_id
+        bump_token_version(db_user)
         db.commit()
+        token_version_cache.invalidate(user_id)
+        response_cache.invalidate("users")
         db.refresh(db_user)
     return db_user
 
@@ -63,7 +155,10 @@ def add_permission(db: Session, role_id: int, permission_id: int):
         return None
     
     role.permissions.append(permission)
+    _bump_permissions_version(role)
     db.commit()
+    permission_cache.invalidate(role_id)
+    response_cache.invalidate("roles", "users")
     db.refresh(role)
     return role
 
@@ -75,7 +170,10 @@ def remove_permission(db: Session, role_id: int, permission_id: int):
         return None
     
     role.permissions.remove(permission)
+    _bump_permissions_version(role)
     db.commit()
+    permission_cache.invalidate(role_id)
+    response_cache.invalidate("roles", "users")
     db.refresh(role)
     return role
 
@@ -88,7 +186,10 @@ def sync_permissions(db: Session, role_id: int, permission_ids: list[int]):
     new_permissions = db.query(Permission).filter(Permission.id.in_(permission_ids)).all()
 
     role.permissions = new_permissions
+    _bump_permissions_version(role)
     
     db.commit()
+    permission_cache.invalidate(role_id)
+    response_cache.invalidate("roles", "users")
     db.refresh(role)
     return role
\ No newline at end of file
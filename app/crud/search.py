@@ -0,0 +1,11 @@
+from sqlalchemy import or_
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def contains(term: str, *columns):
+    # Case-insensitive substring match. On Postgres the pg_trgm GIN indexes
+    # declared on the models serve ILIKE '%term%'; other engines fall back to
+    # a plain scan with the same semantics.
+    pattern = f"%{_escape_like(term)}%"
+    return or_(*(column.ilike(pattern, escape="\\") for column in columns))
@@ -0,0 +1,73 @@
+from collections import defaultdict
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.orm import Session
+from app.models.item import Item
+from app.models.stock_movement import StockMovement
+from app.schemas.stock_movement import StockMovementCreate
+from app.crud.pagination import paginate
+from app.core.response_cache import response_cache
+
+def log_movements(db: Session, movements: list[dict]):
+    # Append-only: rows are only ever inserted, as one executemany per batch
+    if movements:
+        db.execute(insert(StockMovement), movements)
+
+def apply_movements(
+    db: Session,
+    movements: list[StockMovementCreate],
+    user_id: int = None,
+    owner_id: int = None,
+    floor_at_zero: bool = False,
+):
+    # Net the batch per item and apply it with one UPDATE ... RETURNING, then
+    # append the movements, all in one transaction. Returns the new on-hand
+    # quantities, or None (rolled back) if any item could not be updated.
+    deltas = defaultdict(int)
+    for movement in movements:
+        deltas[movement.item_id] += movement.delta
+
+    new_quantity = func.coalesce(Item.quantity, 0) + case(dict(deltas), value=Item.id, else_=0)
+
+    stmt = update(Item).where(Item.id.in_(deltas))
+    if owner_id is not None:
+        stmt = stmt.where(Item.owner_id == owner_id)
+    if floor_at_zero:
+        stmt = stmt.where(new_quantity >= 0)
+
+    stmt = (
+        stmt.values(quantity=new_quantity, version=Item.version + 1)
+        .returning(Item.id, Item.quantity, Item.sku)
+        .execution_options(synchronize_session=False)
+    )
+    updated = db.execute(stmt).all()
+    quantities = {item_id: quantity for item_id, quantity, _ in updated}
+    skus = {item_id: sku for item_id, _, sku in updated}
+
+    if len(quantities) != len(deltas):
+        db.rollback()
+        return None
+
+    # Walk back from the final quantity to get each movement's running balance
+    running = dict(quantities)
+    rows = []
+    for movement in reversed(movements):
+        rows.append({
+            "item_id": movement.item_id,
+            "sku": skus[movement.item_id],
+            "delta": movement.delta,
+            "quantity_after": running[movement.item_id],
+            "reason": movement.reason,
+            "created_by": user_id,
+        })
+        running[movement.item_id] -= movement.delta
+    rows.reverse()
+
+    log_movements(db, rows)
+    db.commit()
+    response_cache.invalidate("items")
+    return quantities
+
+def get_item_movements(db: Session, item_id: int, limit: int = 50, cursor: int = None):
+    query = db.query(StockMovement).filter(StockMovement.item_id == item_id)
+    movements, _ = paginate(query, StockMovement.id, limit=limit, cursor=cursor, count="none")
+    return movements
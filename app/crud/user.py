@@ -1,34 +1,83 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.models.user import User
+from app.models.rbac import Role
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash
-from sqlalchemy import or_
+from app.core.cache import token_version_cache
+from app.core.response_cache import response_cache
+from app.crud.pagination import CountMode, paginate
+from app.crud.search import contains
 
-def get_user_by_username(db: Session, username: str):
-    return db.query(User).filter(User.username == username).first()
+def get_user_by_username(db: Session, username: str, with_permissions: bool = False):
+    # with_permissions joins the role's permissions into the same statement,
+    # for logins that embed them in the token
+    role = joinedload(User.role)
+    if with_permissions:
+        role = role.joinedload(Role.permissions)
+    return db.query(User).options(role).filter(User.username == username).first()
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
+def get_user_token_version(db: Session, user_id: int) -> int | None:
+    cached = token_version_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    generation = token_version_cache.generation(user_id)
+    token_version = db.query(User.token_version).filter(User.id == user_id).scalar()
+    if token_version is not None:
+        token_version_cache.set(user_id, token_version, generation=generation)
+    return token_version
+
+def bump_token_version(db_user: User):
+    # Invalidates every token issued to the user that embeds permissions
+    db_user.token_version = (db_user.token_version or 0) + 1
+
+def create_user(db: Session, user: UserCreate, hashed_password: str = None):
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(username=user.username, email=user.email, password=hashed_password)
     db.add(db_user)
     db.commit()
+    response_cache.invalidate("users")
     db.refresh(db_user)
     return db_user
 
-def get_users(db: Session, skip: int = 0, limit: int = 100, search: str = None):
-    query = db.query(User)
+def _users_query(db: Session, search: str = None):
+    # selectinload issues one IN query per level for the whole page, keyed by
+    # the distinct role ids, so the statement count does not grow with rows
+    query = db.query(User).options(selectinload(User.role).selectinload(Role.permissions))
     if search:
-        query = query.filter(or_(User.username.ilike(f"%{search}%"), User.email.ilike(f"%{search}%")))
-    return query.order_by(User.id.desc()).offset(skip).limit(limit).all()
+        query = query.filter(contains(search, User.username, User.email))
+    return query
 
-def get_total_users(db: Session, search: str = None):
-    query = db.query(User)
+def _user_summaries_query(db: Session, search: str = None):
+    query = (
+        db.query(User.id, User.username, User.email, User.role_id, Role.name.label("role_name"))
+        .outerjoin(Role, Role.id == User.role_id)
+    )
     if search:
-        query = query.filter(or_(User.username.ilike(f"%{search}%"), User.email.ilike(f"%{search}%")))
-    return query.count()
+        query = query.filter(contains(search, User.username, User.email))
+    return query
+
+def get_users(db: Session, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None):
+    users, _ = paginate(_users_query(db, search), User.id, skip=skip, limit=limit, cursor=cursor, count="none")
+    return users
+
+def get_users_page(db: Session, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None, count: CountMode = None):
+    return paginate(_users_query(db, search), User.id, skip=skip, limit=limit, cursor=cursor, count=count)
+
+def get_user_summaries_page(db: Session, skip: int = 0, limit: int = 100, search: str = None, cursor: int = None, count: CountMode = None):
+    return paginate(_user_summaries_query(db, search), User.id, skip=skip, limit=limit, cursor=cursor, count=count)
+
+def get_total_users(db: Session, search: str = None):
+    return _users_query(db, search).count()
 
 def get_user(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+    return (
+        db.query(User)
+        .options(selectinload(User.role).selectinload(Role.permissions))
+        .filter(User.id == user_id)
+        .first()
+    )
 
 def update_user(db: Session, user_id: int, user: UserUpdate):
     query = db.query(User).filter(User.id == user_id)
@@ -38,19 +87,30 @@ def update_user(db: Session, user_id: int, user: UserUpdate):
         for key, value in user.model_dump(exclude_unset=True).items():
             setattr(db_user, key, value)
         db.commit()
+        response_cache.invalidate("users")
         db.refresh(db_user)
     return db_user
 
-def update_password(db: Session, user_id: int, password: str):
+def update_password(db: Session, user_id: int, password: str = None, hashed_password: str = None):
     query = db.query(User).filter(User.id == user_id)
 
     db_user = query.first()
     if db_user:
-        db_user.password = get_password_hash(password)
+        db_user.password = hashed_password if hashed_password is not None else get_password_hash(password)
         db.commit()
         db.refresh(db_user)
     return db_user
 
+def replace_password_hash(db: Session, user_id: int, old_hash: str, new_hash: str) -> bool:
+    # Only swap the hash if the password was not changed in the meantime
+    updated = (
+        db.query(User)
+        .filter(User.id == user_id, User.password == old_hash)
+        .update({User.password: new_hash}, synchronize_session=False)
+    )
+    db.commit()
+    return updated == 1
+
 def delete_user(db: Session, user_id: int):
     query = db.query(User).filter(User.id == user_id)
 
@@ -58,4 +118,7 @@ def delete_user(db: Session, user_id: int):
     if db_user:
         db.delete(db_user)
         db.commit()
+        token_version_cache.invalidate(user_id)
+        # Items are deleted with their owner
+        response_cache.invalidate("users", "items")
     return db_user
\ No newline at end of file
@@ -1,4 +1,5 @@
 from app.models.base import Base
 from app.models.user import User
 from app.models.item import Item
-from app.models.rbac import Role, Permission
\ No newline at end of file
+from app.models.rbac import Role, Permission
+from app.models.stock_movement import StockMovement
\ No newline at end of file
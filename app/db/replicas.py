@@ -0,0 +1,59 @@
+import asyncio
+import itertools
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+class ReplicaSet:
+    # Round-robin over the replicas last seen healthy. Health is checked off
+    # the request path by monitor(), every check_interval; until the first
+    # check every replica counts as healthy.
+    def __init__(self, engines: list, check_interval: float):
+        self.engines = engines
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+        self._healthy = [True] * len(engines)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def choose(self):
+        start = next(self._counter)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._healthy[index]:
+                return self.engines[index]
+        return None
+
+    @staticmethod
+    def _ping(engine) -> None:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    async def check(self) -> None:
+        for index, engine in enumerate(self.engines):
+            try:
+                if isinstance(engine, AsyncEngine):
+                    async with engine.connect() as connection:
+                        await connection.execute(text("SELECT 1"))
+                else:
+                    await run_in_threadpool(self._ping, engine)
+                healthy = True
+            except Exception:
+                healthy = False
+            if healthy != self._healthy[index]:
+                logger.warning("Replica %d is now %s", index, "healthy" if healthy else "unhealthy")
+            self._healthy[index] = healthy
+
+    async def monitor(self) -> None:
+        # Runs for the app's lifetime, started from the lifespan hook
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    def statuses(self) -> list[bool]:
+        return list(self._healthy)
@@ -0,0 +1,70 @@
+"""Schema management, run explicitly instead of on app import.
+
+    python -m app.db.schema          # create or upgrade the schema
+    python -m app.db.schema --status # print the recorded and latest versions
+
+A fresh database gets every table from the models and is stamped with the
+latest migration. An existing one runs the migrations after its recorded
+version (app/db/migrations.py), then gets any missing tables, all in one
+transaction.
+"""
+import argparse
+from typing import Optional
+
+from sqlalchemy import Column, Integer, MetaData, Table, inspect, select
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.base import Base
+from app.db.migrations import LATEST_VERSION, MIGRATIONS, Migration
+from app.db.session import engine
+
+# Kept out of Base.metadata so the models never drop or recreate it
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, nullable=False),
+)
+
+def recorded_version(connection: Connection) -> Optional[int]:
+    if not inspect(connection).has_table(schema_version.name):
+        return None
+    return connection.execute(select(schema_version.c.version)).scalar()
+
+def upgrade_schema(bind: Engine = engine) -> list[Migration]:
+    # Returns the migrations that ran
+    with bind.begin() as connection:
+        fresh = not inspect(connection).has_table("users")
+        version = recorded_version(connection)
+        if version is None:
+            version = LATEST_VERSION if fresh else 0
+
+        applied = [migration for migration in MIGRATIONS if migration.version > version]
+        for migration in applied:
+            migration.upgrade(connection)
+
+        Base.metadata.create_all(bind=connection)
+        schema_version.create(connection, checkfirst=True)
+        connection.execute(schema_version.delete())
+        connection.execute(schema_version.insert().values(version=LATEST_VERSION))
+    return applied
+
+def create_schema() -> None:
+    upgrade_schema()
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema")
+    parser.add_argument("--status", action="store_true", help="only print the recorded and latest versions")
+    args = parser.parse_args()
+
+    url = engine.url.render_as_string(hide_password=True)
+    if args.status:
+        with engine.connect() as connection:
+            print(f"{url}: version {recorded_version(connection)}, latest {LATEST_VERSION}")
+        return
+
+    for migration in upgrade_schema():
+        print(f"applied {migration.version}: {migration.description}")
+    print(f"Schema at version {LATEST_VERSION} on {url}")
+
+if __name__ == "__main__":
+    main()
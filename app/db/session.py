@@ -1,15 +1,198 @@
+import time
+
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
 
-from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.config import settings, to_async_url
+from app.core.metrics import install_query_metrics
+from app.core.response_cache import response_cache
+from app.core.security import token_subject
+from app.db.pool import engine_options, install_idle_ping, pool_status
+from app.db.replicas import ReplicaSet
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+install_idle_ping(engine)
+install_query_metrics(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URI, **engine_options(settings.ASYNC_DATABASE_URI, is_async=True)
+    )
+    install_idle_ping(async_engine.sync_engine)
+    install_query_metrics(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def _create_replica_engine(url: str):
+    if settings.DATABASE_ASYNC:
+        url = to_async_url(url)
+        replica_engine = create_async_engine(url, **engine_options(url, is_async=True))
+        install_idle_ping(replica_engine.sync_engine)
+        install_query_metrics(replica_engine.sync_engine)
+    else:
+        replica_engine = create_engine(url, **engine_options(url))
+        install_idle_ping(replica_engine)
+        install_query_metrics(replica_engine)
+    return replica_engine
+
+replicas = ReplicaSet(
+    [_create_replica_engine(url) for url in settings.DATABASE_REPLICA_URLS],
+    check_interval=settings.DATABASE_REPLICA_HEALTH_CHECK_SECONDS,
+)
+
+def get_pool_statuses() -> list[dict]:
+    statuses = [pool_status("primary", engine)]
+    if async_engine is not None:
+        statuses.append(pool_status("primary_async", async_engine.sync_engine))
+    for index, replica_engine in enumerate(replicas.engines):
+        replica_engine = getattr(replica_engine, "sync_engine", replica_engine)
+        statuses.append(pool_status(f"replica_{index}", replica_engine))
+    return statuses
+
+# Read-your-writes: after a successful write, the writing user's reads are
+# served by the primary for READ_YOUR_WRITES_SECONDS. Users are tracked
+# server-side by token subject, so every client and API caller of that user
+# is pinned. The map is per process; the cookie set alongside carries the
+# pin to other workers for the client that wrote.
+PRIMARY_READS_COOKIE = "db_primary_until"
+
+primary_pins = TTLCache(
+    maxsize=settings.READ_YOUR_WRITES_MAX_USERS,
+    ttl=settings.READ_YOUR_WRITES_SECONDS,
+)
+
+def _request_subject(request: Request):
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token_subject(token)
+
+def pin_reads_to_primary(request: Request, response) -> None:
+    subject = _request_subject(request)
+    if subject is not None:
+        primary_pins.set(subject, True)
+
+    response.set_cookie(
+        key=PRIMARY_READS_COOKIE,
+        value=f"{time.time() + settings.READ_YOUR_WRITES_SECONDS:.3f}",
+        max_age=max(int(settings.READ_YOUR_WRITES_SECONDS) + 1, 1),
+        httponly=True,
+        samesite=settings.COOKIE_SAME_SITE,
+        secure=settings.COOKIE_SECURE,
+        path="/",
+    )
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    try:
+        if float(request.cookies.get(PRIMARY_READS_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    # Skip decoding the token while nobody is pinned
+    return len(primary_pins) > 0 and primary_pins.get(_request_subject(request)) is not None
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+get_db = get_async_db if settings.DATABASE_ASYNC else get_sync_db
+
+def get_sync_read_db(request: Request):
+    replica_engine = None if reads_pinned_to_primary(request) else replicas.choose()
+    db = SessionLocal(bind=replica_engine) if replica_engine is not None else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    replica_engine = None if reads_pinned_to_primary(request) else replicas.choose()
+    session = AsyncSessionLocal(bind=replica_engine) if replica_engine is not None else AsyncSessionLocal()
+    async with session as db:
+        yield db
+
+# Read-only routes depend on get_read_db: a healthy replica when configured,
+# the primary otherwise (no replicas, all down, or read-your-writes window).
+if not replicas:
+    get_read_db = get_db
+elif settings.DATABASE_ASYNC:
+    get_read_db = get_async_read_db
+else:
+    get_read_db = get_sync_read_db
+
+def _warm_sync_pool(target_engine, connections: int) -> None:
+    # Hold several checkouts at once so the pool really opens that many
+    opened = [target_engine.connect() for _ in range(connections)]
+    for connection in opened:
+        connection.close()
+
+async def warm_pools(connections: int = settings.DATABASE_POOL_SIZE) -> None:
+    engines = [async_engine if async_engine is not None else engine, *replicas.engines]
+    for target_engine in engines:
+        if isinstance(target_engine, AsyncEngine):
+            opened = [await target_engine.connect() for _ in range(connections)]
+            for connection in opened:
+                await connection.close()
+        else:
+            await run_in_threadpool(_warm_sync_pool, target_engine, connections)
+
+async def run_in_new_session(fn, *args, **kwargs):
+    # For work that outlives the request session, e.g. background tasks
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            result = await db.run_sync(fn, *args, **kwargs)
+        await response_cache.flush()
+        return result
+
+    def run():
+        with SessionLocal() as db:
+            return fn(db, *args, **kwargs)
+
+    return await run_in_threadpool(run)
+
+def _stream_partitions(stmt, batch_size: int, use_replica: bool):
+    replica_engine = replicas.choose() if use_replica else None
+    with SessionLocal(bind=replica_engine or engine) as db:
+        result = db.execute(stmt, execution_options={"stream_results": True, "yield_per": batch_size})
+        yield from result.partitions()
+
+async def _stream_partitions_async(stmt, batch_size: int, use_replica: bool):
+    replica_engine = replicas.choose() if use_replica else None
+    async with AsyncSessionLocal(bind=replica_engine or async_engine) as db:
+        result = await db.stream(stmt, execution_options={"yield_per": batch_size})
+        async for partition in result.partitions():
+            yield partition
+
+def stream_partitions(stmt, batch_size: int, use_replica: bool = False):
+    # Server-side cursor over stmt in its own session, so it can outlive the
+    # request's session while a StreamingResponse is being sent. Returns an
+    # async iterator in async mode and a plain iterator otherwise.
+    if AsyncSessionLocal is not None:
+        return _stream_partitions_async(stmt, batch_size, use_replica)
+    return _stream_partitions(stmt, batch_size, use_replica)
+
+async def run_db(db, fn, *args, **kwargs):
+    # CRUD functions are written against a sync Session. An AsyncSession runs
+    # them on its own connection via run_sync; a sync Session runs them in the
+    # threadpool so the event loop is never blocked on the database.
+    if isinstance(db, AsyncSession):
+        result = await db.run_sync(fn, *args, **kwargs)
+        # Cache invalidations made on the event loop thread are deferred
+        await response_cache.flush()
+        return result
+    return await run_in_threadpool(fn, db, *args, **kwargs)
@@ -1,46 +1,169 @@
-from fastapi import Depends, HTTPException, status
+from typing import NamedTuple, Optional
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.session import get_db
-from app.models.user import User
+from app.db.session import get_db, get_read_db, run_db
+from app.core.cache import permission_cache, token_version_cache
+from app.crud.role import get_role_permissions
+from app.crud.user import get_user_by_username, get_user_token_version
 from app.schemas.token import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+async def get_token_data(token: str = Depends(oauth2_scheme)) -> TokenData:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.username == token_data.username).first()
+
+    username: str = payload.get("sub")
+    if username is None:
+        raise credentials_exception
+
+    return TokenData(
+        username=username,
+        role=payload.get("role"),
+        user_id=payload.get("uid"),
+        role_id=payload.get("rid"),
+        permissions=payload.get("perms"),
+        permissions_version=payload.get("pv"),
+        token_version=payload.get("tv"),
+    )
+
+def _auth_db(request: Request, db: Session, read_db: Session) -> Session:
+    # Only safe methods may authorize from a replica; a write must see the
+    # user's current role. Both are the route's own sessions (FastAPI caches
+    # dependencies per request) and connect only when used.
+    return read_db if request.method in SAFE_METHODS else db
+
+async def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+    token_data: TokenData = Depends(get_token_data),
+):
+    # PermissionChecker may already have loaded the user for this request
+    user = getattr(request.state, "current_user", None)
+    if user is not None:
+        return user
+
+    user = await run_db(_auth_db(request, db, read_db), get_user_by_username, token_data.username)
     if user is None:
         raise credentials_exception
+
+    request.state.current_user = user
     return user
 
+# Role permissions and token versions are always read from the primary:
+# they fill process-wide caches, and a lagging replica would put a revoked
+# grant or an old token version back for the whole TTL.
+async def _get_role_permissions(db: Session, role_id: int):
+    # Skip the threadpool/greenlet hop entirely on a cache hit
+    cached = permission_cache.get(role_id)
+    if cached is not None:
+        return cached
+    return await run_db(db, get_role_permissions, role_id)
+
+async def _get_user_token_version(db: Session, user_id: int):
+    cached = token_version_cache.get(user_id)
+    if cached is not None:
+        return cached
+    return await run_db(db, get_user_token_version, user_id)
+
+async def _token_permissions(request: Request, db: Session, token_data: TokenData):
+    # The embedded permissions if the token can still be trusted, else None.
+    # Checked once per request, whichever dependency asks first.
+    if not hasattr(request.state, "token_permissions"):
+        request.state.token_permissions = await PermissionChecker._permissions_from_token(db, token_data)
+    return request.state.token_permissions
+
+class Principal(NamedTuple):
+    # Who is asking: enough for owner scoping without loading the user
+    id: int
+    role: Optional[str]
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "ADMIN"
+
+async def get_current_principal(
+    request: Request,
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+    token_data: TokenData = Depends(get_token_data),
+) -> Principal:
+    # A trusted permission-bearing token already names the user and role
+    # (its token version proves the role is unchanged), so safe-method
+    # requests skip loading the user.
+    if request.method in SAFE_METHODS and await _token_permissions(request, db, token_data) is not None:
+        return Principal(id=token_data.user_id, role=token_data.role)
+
+    user = await get_current_user(request, db=db, read_db=read_db, token_data=token_data)
+    return Principal(id=user.id, role=user.role.name if user.role is not None else None)
+
 class PermissionChecker:
     def __init__(self, required_permission: str):
         self.required_permission = required_permission
     
-    def __call__(self, current_user: User = Depends(get_current_user)):
-        user_permissions = [p.name for p in current_user.role.permissions]
+    async def __call__(
+        self,
+        request: Request,
+        db: Session = Depends(get_db),
+        read_db: Session = Depends(get_read_db),
+        token_data: TokenData = Depends(get_token_data),
+    ):
+        user_permissions = None
+
+        if request.method in SAFE_METHODS:
+            user_permissions = await _token_permissions(request, db, token_data)
+
+        if user_permissions is None:
+            current_user = await get_current_user(request, db=db, read_db=read_db, token_data=token_data)
+            if current_user.role_id is None:
+                user_permissions = frozenset()
+            else:
+                role_permissions = await _get_role_permissions(db, current_user.role_id)
+                user_permissions = role_permissions.names
 
         if self.required_permission not in user_permissions:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Not permission for {self.required_permission}",
             )
-        return True
\ No newline at end of file
+        return True
+
+    @staticmethod
+    async def _permissions_from_token(db: Session, token_data: TokenData):
+        if (
+            token_data.permissions is None
+            or token_data.user_id is None
+            or token_data.role_id is None
+            or token_data.token_version is None
+        ):
+            return None
+
+        # Trust the embedded permissions only while the user still has the
+        # role (reassigning or deleting the user bumps its token version) and
+        # the role's permission set is unchanged; otherwise fall back to
+        # loading the user.
+        token_version = await _get_user_token_version(db, token_data.user_id)
+        if token_version != token_data.token_version:
+            return None
+
+        role_permissions = await _get_role_permissions(db, token_data.role_id)
+        if role_permissions.version != token_data.permissions_version:
+            return None
+
+        return token_data.permissions
@@ -1,3 +1,4 @@
 from .user import User
 from .item import Item
-from .rbac import Role, Permission
\ No newline at end of file
+from .rbac import Role, Permission
+from .stock_movement import StockMovement
\ No newline at end of file
@@ -1,3 +1,19 @@
+from sqlalchemy import DDL, Index, event
 from sqlalchemy.ext.declarative import declarative_base
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+def trigram_index(name: str, column: str) -> Index:
+    # GIN trigram index for substring search; skipped on engines without pg_trgm
+    return Index(
+        name,
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
\ No newline at end of file
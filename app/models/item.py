@@ -1,16 +1,22 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
-from .base import Base
+from .base import Base, trigram_index
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        trigram_index("ix_items_name_trgm", "name"),
+        trigram_index("ix_items_sku_trgm", "sku"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(String, nullable=False)
     sku = Column(String, index=False, unique=True)
     quantity = Column(Integer, default=0)
+    # Bumped on every write; the source of the item ETags
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
-    owner = relationship("User", back_populates="items")
\ No newline at end of file
+    owner = relationship("User", back_populates="items")
@@ -15,6 +15,10 @@ class Role(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, unique=True)
     description = Column(String)
+    # version changes with any change to the serialized role, including its
+    # permission set; permissions_version only with the permission set
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    permissions_version = Column(Integer, nullable=False, default=1, server_default="1")
 
     permissions = relationship("Permission", secondary=role_permission, back_populates="roles")
     users = relationship("User", back_populates="role")
@@ -25,5 +29,6 @@ class Permission(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, unique=True, index=True)
     description = Column(String)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     roles = relationship("Role", secondary=role_permission, back_populates="permissions")
\ No newline at end of file
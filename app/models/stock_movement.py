@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, func
+from .base import Base
+
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        # Keyset paging of an item's history: WHERE item_id = ? AND id < ?
+        Index("ix_stock_movements_item_id_id", "item_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # No foreign key to items: the ledger outlives the item, so deleting it
+    # leaves item_id, and the SKU recorded with each movement, as they were
+    item_id = Column(Integer, nullable=False)
+    sku = Column(String)
+    delta = Column(Integer, nullable=False)
+    quantity_after = Column(Integer, nullable=False)
+    reason = Column(String)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
@@ -1,16 +1,23 @@
 from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
-from .base import Base
+from .base import Base, trigram_index
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        trigram_index("ix_users_username_trgm", "username"),
+        trigram_index("ix_users_email_trgm", "email"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, nullable=False, unique=True, index=True)
     password = Column(String, nullable=False)
     email = Column(String, nullable=False, unique=True, index=True)
 
     role_id = Column(Integer, ForeignKey("roles.id", ondelete="CASCADE"))
+    # Bumped when the user's role changes; tokens that embed permissions
+    # are only trusted while theirs matches
+    token_version = Column(Integer, nullable=False, default=1, server_default="1")
 
     role = relationship("Role", back_populates="users")
     items = relationship("Item", back_populates="owner")
\ No newline at end of file
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.db.session import get_db
-from app.core.security import verify_password, create_access_token
+from app.db.session import get_db, run_db, run_in_new_session
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from app.core.worker_pool import PoolSaturated
 from app.crud import user as crud_user
 from app.schemas.token import Token
 from app.schemas.response import SuccessResponse
@@ -11,21 +17,46 @@ from app.core.config import settings
 
 router = APIRouter()
 
+async def rehash_password(user_id: int, password: str, old_hash: str):
+    try:
+        new_hash = await get_password_hash_async(password)
+    except PoolSaturated:
+        # Not urgent; the next login will try again
+        return
+    await run_in_new_session(crud_user.replace_password_hash, user_id, old_hash, new_hash)
+
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     response: Response,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     form_data : OAuth2PasswordRequestForm = Depends()
 ):
-    user = crud_user.get_user_by_username(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.password):
+    user = await run_db(
+        db, crud_user.get_user_by_username, form_data.username,
+        with_permissions=settings.ACCESS_TOKEN_EMBED_PERMISSIONS,
+    )
+    if not user or not await verify_password_async(form_data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    if password_needs_rehash(user.password):
+        background_tasks.add_task(rehash_password, user.id, form_data.password, user.password)
     
-    access_token = create_access_token(subject=user.username, role=user.role.name)
+    claims = {}
+    if settings.ACCESS_TOKEN_EMBED_PERMISSIONS and user.role is not None:
+        claims = {
+            "user_id": user.id,
+            "role_id": user.role_id,
+            "permissions": [permission.name for permission in user.role.permissions],
+            "permissions_version": user.role.permissions_version,
+            "token_version": user.token_version,
+        }
+
+    access_token = create_access_token(subject=user.username, role=user.role.name, **claims)
     response.set_cookie(
         key="access_token", 
         value=access_token, 
@@ -39,6 +70,6 @@ def login(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/logout", response_model=SuccessResponse)
-def logout(response: Response):
+async def logout(response: Response):
     response.delete_cookie(key="access_token")
     return SuccessResponse(message="Successfully logged out")
\ No newline at end of file
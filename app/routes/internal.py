@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from app.db.session import get_pool_statuses
+from app.core.response_cache import response_cache
+from app.schemas.internal import CacheStats, PoolStatus
+from app.dependencies import PermissionChecker
+
+router = APIRouter()
+
+@router.get("/pool", response_model=list[PoolStatus])
+async def get_pool_status(
+    _: bool = Depends(PermissionChecker("system:metrics"))
+):
+    return get_pool_statuses()
+
+@router.get("/cache", response_model=list[CacheStats])
+async def get_cache_stats(
+    _: bool = Depends(PermissionChecker("system:metrics"))
+):
+    return response_cache.stats()
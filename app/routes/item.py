@@ -1,65 +1,201 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, reads_pinned_to_primary, run_db, stream_partitions
 from app.crud import item as crud_item
-from app.schemas.item import Item, ItemCreate, ItemUpdate, ItemPage
+from app.crud import stock_movement as crud_stock_movement
+from app.crud.pagination import CountMode, total_pages
+from app.core.config import settings
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.response_cache import cached_page, cached_response, response_cache
+from app.core.item_io import (
+    EXPORT_MEDIA_TYPES, ItemFileFormat, csv_header, detect_format, encode_rows, iter_records, read_batch
+)
+from app.schemas.item import (
+    Item, ItemCreate, ItemUpdate, ItemPage, ItemAdjust, ItemStock, ItemImportError, ItemImportReport
+)
+from app.schemas.stock_movement import StockMovementCreate, StockMovementBatch, StockMovementPage
 from app.schemas.response import SuccessResponse
 from app.models.user import User
-from app.dependencies import get_current_user, PermissionChecker
+from app.dependencies import Principal, get_current_principal, get_current_user, PermissionChecker
 
 router = APIRouter()
 
 @router.post("", response_model=SuccessResponse, status_code=status.HTTP_201_CREATED)
-def create_item(
+async def create_item(
     item_in: ItemCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
     _: bool = Depends(PermissionChecker("item:create"))
 ):
-    crud_item.create_item(db, item=item_in, user_id=current_user.id)
+    await run_db(db, crud_item.create_item, item=item_in, user_id=current_user.id)
 
     return SuccessResponse(message="Item created successfully")
 
 
-@router.get("", response_model=ItemPage)
-def get_items(
+@router.post("/import", response_model=ItemImportReport)
+async def import_items(
+    file: UploadFile = File(...),
+    format: ItemFileFormat | None = None,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
+    _: bool = Depends(PermissionChecker("item:create"))
+):
+    is_admin = current_user.role.name == "ADMIN"
+    file_format = format or detect_format(file.filename, file.content_type)
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    records = iter_records(stream, file_format)
+
+    imported = 0
+    errors: list[ItemImportError] = []
+
+    # Parse and validate one batch at a time so memory stays bounded by the
+    # batch size, then upsert the valid rows in a single statement.
+    while True:
+        try:
+            seen, valid, batch_errors = await run_in_threadpool(
+                read_batch, records, settings.ITEM_IMPORT_BATCH_SIZE
+            )
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Could not parse upload: {exc}",
+            )
+        if not seen:
+            break
+
+        errors.extend(batch_errors)
+
+        written = await run_db(
+            db, crud_item.upsert_items,
+            [item for _, item in valid],
+            owner_id=current_user.id,
+            restrict_to_owner=not is_admin,
+        )
+        for row_number, item in valid:
+            if item.sku in written:
+                imported += 1
+            else:
+                errors.append(ItemImportError(
+                    row=row_number, errors=["sku: already used by another user's item"]
+                ))
+
+    errors.sort(key=lambda error: error.row)
+    return ItemImportReport(imported=imported, failed=len(errors), errors=errors)
+
+@router.get("", response_model=ItemPage)
+async def get_items(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    principal: Principal = Depends(get_current_principal),
     page: int = 1,
     limit: int = 10,
     search: str | None = None,
+    cursor: int | None = None,
+    count: CountMode | None = None,
     _: bool = Depends(PermissionChecker("item:view_all"))
 ):
-    offset = (page - 1) * limit
-    is_admin = current_user.role.name == "ADMIN"
+    offset = (page - 1) * limit if cursor is None else 0
+    owner_id = None if principal.is_admin else principal.id
 
-    if is_admin:
-        items = crud_item.get_items(db, skip=offset, limit=limit, search=search)
-        total = crud_item.get_total_items(db, search=search)
+    cache_params = dict(owner_id=owner_id, page=page, limit=limit, search=search, cursor=cursor, count=count)
+    lookup = await response_cache.get("items", cache_params)
+    if lookup.cached is not None:
+        if etag_matches(request, lookup.cached.etag):
+            return not_modified(lookup.cached.etag)
+        return cached_response(lookup.cached)
+
+    if owner_id is None:
+        items, total = await run_db(
+            db, crud_item.get_items_page, skip=offset, limit=limit, search=search, cursor=cursor, count=count
+        )
     else:
-        items = crud_item.get_user_items(db, user_id=current_user.id, skip=offset, limit=limit, search=search)
-        total = crud_item.get_user_total_items(db, user_id=current_user.id, search=search)
+        items, total = await run_db(
+            db, crud_item.get_user_items_page,
+            user_id=owner_id, skip=offset, limit=limit, search=search, cursor=cursor, count=count
+        )
+
+    # Computed from the rows in the body: their (id, version) pairs and total
+    versions = [(item["id"], item["version"]) for item in items]
+    etag = make_etag("items", owner_id, page, limit, search, cursor, count, total, versions)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
 
-    return ItemPage(
+    item_page = ItemPage(
         items=items,
         total=total,
         page=page,
         limit=limit,
-        total_pages=(total + limit - 1) // limit
+        total_pages=total_pages(total, limit),
+        next_cursor=items[-1]["id"] if len(items) == limit else None
+    )
+    return await cached_page(lookup, item_page, etag)
+
+@router.get("/export")
+async def export_items(
+    request: Request,
+    format: ItemFileFormat = "csv",
+    search: str | None = None,
+    principal: Principal = Depends(get_current_principal),
+    _: bool = Depends(PermissionChecker("item:view_all"))
+):
+    stmt = crud_item.export_items_statement(search=search, user_id=None if principal.is_admin else principal.id)
+    partitions = stream_partitions(
+        stmt, settings.ITEM_EXPORT_BATCH_SIZE, use_replica=not reads_pinned_to_primary(request)
+    )
+    header = csv_header(stmt.selected_columns.keys()) if format == "csv" else ""
+
+    if hasattr(partitions, "__aiter__"):
+        async def body():
+            if header:
+                yield header
+            async for rows in partitions:
+                yield encode_rows(rows, format)
+    else:
+        def body():
+            if header:
+                yield header
+            for rows in partitions:
+                yield encode_rows(rows, format)
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'},
     )
 
 @router.get("/{item_id}", response_model=Item)
-def get_item(
+async def get_item(
     item_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     _: bool = Depends(PermissionChecker("item:view"))
 ):
-    return crud_item.get_item(db, item_id)
+    item = await run_db(db, crud_item.get_item, item_id)
+    if item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
+        )
+
+    etag = make_etag("item", item.id, item.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return item
 
 @router.put("/{item_id}", response_model=SuccessResponse)
-def update_item(
+async def update_item(
     item_id: int,
     item_in: ItemUpdate,
     db: Session = Depends(get_db),
@@ -68,46 +204,153 @@ def update_item(
 ):
     is_admin = current_user.role.name == "ADMIN"
 
+    item = await run_db(db, crud_item.get_item, item_id=item_id)
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
+        )
+
     if not is_admin and item.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to update this item",
         )
 
-    item = crud_item.get_item(db, item_id=item_id)
-    if not item:
+    await run_db(db, crud_item.update_item, item_id=item_id, item=item_in, user_id=current_user.id)
+    
+    return SuccessResponse(message="Item updated successfully")
+
+async def _raise_movement_error(db: Session, item_ids, is_admin: bool, user_id: int):
+    owners = await run_db(db, crud_item.get_item_owners, list(item_ids))
+
+    missing = sorted(set(item_ids) - owners.keys())
+    if missing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Item not found",
+            detail=f"Item not found: {', '.join(map(str, missing))}",
         )
-    crud_item.update_item(db, item_id=item_id, item=item_in)
-    
-    return SuccessResponse(message="Item updated successfully")
 
-@router.delete("/{item_id}", response_model=SuccessResponse)
-def delete_item(
+    if not is_admin and any(owner_id != user_id for owner_id in owners.values()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to update this item",
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Insufficient stock",
+    )
+
+@router.post("/{item_id}/adjust", response_model=ItemStock)
+async def adjust_item_stock(
     item_id: int,
+    adjustment: ItemAdjust,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    _: bool = Depends(PermissionChecker("item:delete"))
+    _: bool = Depends(PermissionChecker("item:update"))
 ):
+    # A failed batch is rolled back, which expires current_user; read it first
     is_admin = current_user.role.name == "ADMIN"
-    
-    if not is_admin and item.owner_id != current_user.id:
+    user_id = current_user.id
+    movement = StockMovementCreate(item_id=item_id, delta=adjustment.delta, reason=adjustment.reason)
+
+    quantities = await run_db(
+        db, crud_stock_movement.apply_movements,
+        [movement],
+        user_id=user_id,
+        owner_id=None if is_admin else user_id,
+        floor_at_zero=adjustment.floor_at_zero,
+    )
+
+    if quantities is None:
+        await _raise_movement_error(db, [item_id], is_admin, user_id)
+
+    return ItemStock(id=item_id, quantity=quantities[item_id])
+
+@router.post("/movements", response_model=list[ItemStock])
+async def record_stock_movements(
+    batch: StockMovementBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    _: bool = Depends(PermissionChecker("item:update"))
+):
+    is_admin = current_user.role.name == "ADMIN"
+    user_id = current_user.id
+
+    quantities = await run_db(
+        db, crud_stock_movement.apply_movements,
+        batch.movements,
+        user_id=user_id,
+        owner_id=None if is_admin else user_id,
+        floor_at_zero=batch.floor_at_zero,
+    )
+
+    if quantities is None:
+        await _raise_movement_error(db, {m.item_id for m in batch.movements}, is_admin, user_id)
+
+    return [ItemStock(id=item_id, quantity=quantity) for item_id, quantity in quantities.items()]
+
+@router.get("/{item_id}/movements", response_model=StockMovementPage)
+async def get_item_movements(
+    item_id: int,
+    limit: int = 50,
+    cursor: int | None = None,
+    db: Session = Depends(get_read_db),
+    principal: Principal = Depends(get_current_principal),
+    _: bool = Depends(PermissionChecker("item:view"))
+):
+    is_admin = principal.is_admin
+    item = await run_db(db, crud_item.get_item, item_id=item_id)
+    # The history of a deleted item stays readable for admins
+    if not item and not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
+        )
+
+    if item and not is_admin and item.owner_id != principal.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to delete this item",
+            detail="You don't have permission to view this item",
+        )
+
+    movements = await run_db(db, crud_stock_movement.get_item_movements, item_id, limit=limit, cursor=cursor)
+    if not item and not movements and cursor is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
         )
 
-    item = crud_item.get_item(db, item_id=item_id)
+    return StockMovementPage(
+        movements=movements,
+        limit=limit,
+        next_cursor=movements[-1].id if len(movements) == limit else None
+    )
+
+@router.delete("/{item_id}", response_model=SuccessResponse)
+async def delete_item(
+    item_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    _: bool = Depends(PermissionChecker("item:delete"))
+):
+    is_admin = current_user.role.name == "ADMIN"
+
+    item = await run_db(db, crud_item.get_item, item_id=item_id)
 
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found",
         )
-    
-    
-    crud_item.delete_item(db, item_id=item_id)
+
+    if not is_admin and item.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have permission to delete this item",
+        )
+
+    await run_db(db, crud_item.delete_item, item_id=item_id)
     
     return SuccessResponse(message="Item deleted successfully")
\ No newline at end of file
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, run_db
 from app.crud import permission as crud_permission
+from app.crud.pagination import CountMode, total_pages
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.response_cache import cached_page, cached_response, response_cache
 from app.schemas.permission import Permission, PermissionCreate, PermissionUpdate, PermissionPage
 from app.schemas.response import SuccessResponse
 from app.models.user import User
@@ -12,62 +15,88 @@ from app.dependencies import get_current_user, PermissionChecker
 router = APIRouter()
 
 @router.get("", response_model=PermissionPage)
-def get_permissions(
-    db: Session = Depends(get_db), 
+async def get_permissions(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db), 
     page: int = 1,
     limit: int | None = None,
     search: str | None = None,
+    cursor: int | None = None,
+    count: CountMode | None = None,
     _: bool = Depends(PermissionChecker("permission:view_all"))
 ):
-    if limit is not None:
-        offset = (page - 1) * limit
-        permissions = crud_permission.get_permissions(db, skip=offset, limit=limit, search=search)
-    else:
-        permissions = crud_permission.get_permissions(db, skip=0, limit=None)
+    cache_params = dict(page=page, limit=limit, search=search, cursor=cursor, count=count)
+    lookup = await response_cache.get("permissions", cache_params)
+    if lookup.cached is not None:
+        if etag_matches(request, lookup.cached.etag):
+            return not_modified(lookup.cached.etag)
+        return cached_response(lookup.cached)
+
+    offset = (page - 1) * limit if limit is not None and cursor is None else 0
+    permissions, total = await run_db(
+        db, crud_permission.get_permissions_page, skip=offset, limit=limit, search=search, cursor=cursor, count=count
+    )
 
-    total = crud_permission.get_total_permissions(db, search=search)
+    etag = make_etag(
+        "permissions", page, limit, search, cursor, count, total,
+        [(permission.id, permission.version) for permission in permissions],
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
 
-    actual_limit = limit if limit else total if total > 0 else 1
+    next_cursor = permissions[-1].id if limit is not None and len(permissions) == limit else None
+    if limit is None:
+        limit = total if total is not None else len(permissions)
 
-    return PermissionPage(
+    permission_page = PermissionPage(
         permissions=permissions,
         total=total,
         page=page,
-        limit=limit if limit else total,
-        total_pages=(total + actual_limit - 1) // actual_limit
+        limit=limit,
+        total_pages=total_pages(total, limit or 1),
+        next_cursor=next_cursor
     )
+    return await cached_page(lookup, permission_page, etag)
 
 @router.get("/{permission_id}", response_model=Permission)
-def get_permission(
+async def get_permission(
     permission_id: int, 
-    db: Session = Depends(get_db), 
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db), 
     _: bool = Depends(PermissionChecker("permission:view"))
 ):
-    permission = crud_permission.get_permission(db, permission_id)
+    permission = await run_db(db, crud_permission.get_permission, permission_id)
 
     if not permission:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Permission not found")
 
+    etag = make_etag("permission", permission.id, permission.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return permission
 
 @router.post("", response_model=SuccessResponse, status_code=status.HTTP_201_CREATED)
-def create_permission(
+async def create_permission(
     permission_in: PermissionCreate, 
     db: Session = Depends(get_db), 
     _: bool = Depends(PermissionChecker("permission:create"))
 ):
-    crud_permission.create_permission(db, permission_in)
+    await run_db(db, crud_permission.create_permission, permission_in)
 
     return SuccessResponse(message="Permission created successfully")
 
 @router.patch("/{permission_id}", response_model=SuccessResponse)
-def update_permission(
+async def update_permission(
     permission_id: int, 
     permission_in: PermissionUpdate, 
     db: Session = Depends(get_db), 
     _: bool = Depends(PermissionChecker("permission:update"))
 ):
-    permission = crud_permission.update_permission(db, permission_id, permission_in)
+    permission = await run_db(db, crud_permission.update_permission, permission_id, permission_in)
 
     if not permission:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Permission not found")
@@ -75,12 +104,12 @@ def update_permission(
     return SuccessResponse(message="Permission updated successfully")
 
 @router.delete("/{permission_id}", response_model=SuccessResponse)
-def delete_permission(
+async def delete_permission(
     permission_id: int, 
     db: Session = Depends(get_db), 
     _: bool = Depends(PermissionChecker("permission:delete"))
 ):
-    permission = crud_permission.delete_permission(db, permission_id)
+    permission = await run_db(db, crud_permission.delete_permission, permission_id)
 
     if not permission:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Permission not found")
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, run_db
 from app.crud import role as crud_role
+from app.crud.pagination import CountMode, total_pages
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.response_cache import cached_page, cached_response, response_cache
 from app.schemas.role import Role, RoleCreate, RoleUpdate, RolePage, RolePermissionUpdate
 from app.schemas.response import SuccessResponse
 from app.models.user import User
@@ -12,58 +15,83 @@ from app.dependencies import get_current_user, PermissionChecker
 router = APIRouter()
 
 @router.get("", response_model=RolePage)
-def get_roles(
-    db: Session = Depends(get_db), 
+async def get_roles(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db), 
     page: int = 1,
     limit: int = 10,
     search: str | None = None,
+    cursor: int | None = None,
+    count: CountMode | None = None,
     _: bool = Depends(PermissionChecker("role:view_all"))
 ):
-    offset = (page - 1) * limit
+    offset = (page - 1) * limit if cursor is None else 0
+
+    cache_params = dict(page=page, limit=limit, search=search, cursor=cursor, count=count)
+    lookup = await response_cache.get("roles", cache_params)
+    if lookup.cached is not None:
+        if etag_matches(request, lookup.cached.etag):
+            return not_modified(lookup.cached.etag)
+        return cached_response(lookup.cached)
 
-    roles = crud_role.get_roles(db, skip=offset, limit=limit, search=search)
-    total = crud_role.get_total_roles(db, search=search)
+    roles, total = await run_db(db, crud_role.get_roles_page, skip=offset, limit=limit, search=search, cursor=cursor, count=count)
 
-    return RolePage(
+    # Role.version also moves when the role's permissions change, so the
+    # (id, version) pairs cover the embedded permission lists too
+    etag = make_etag("roles", page, limit, search, cursor, count, total, [(role.id, role.version) for role in roles])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    role_page = RolePage(
         roles=roles,
         total=total,
         page=page,
         limit=limit,
-        total_pages=(total + limit - 1) // limit
+        total_pages=total_pages(total, limit),
+        next_cursor=roles[-1].id if len(roles) == limit else None
     )
+    return await cached_page(lookup, role_page, etag)
 
 @router.get("/{role_id}", response_model=Role)
-def get_role(
+async def get_role(
     role_id: int, 
-    db: Session = Depends(get_db), 
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db), 
     _: bool = Depends(PermissionChecker("role:view"))
 ):
-    role = crud_role.get_role(db, role_id)
+    role = await run_db(db, crud_role.get_role, role_id)
 
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
 
+    etag = make_etag("role", role.id, role.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return role
 
 @router.post("", response_model=SuccessResponse, status_code=status.HTTP_201_CREATED)
-def create_role(
+async def create_role(
     role_in: RoleCreate, 
     db: Session = Depends(get_db), 
     _: bool = Depends(PermissionChecker("role:create"))
 ):
     role_in.name = role_in.name.upper()
-    crud_role.create_role(db, role_in)
+    await run_db(db, crud_role.create_role, role_in)
 
     return SuccessResponse(message="Role created successfully")
 
 @router.put("/{role_id}", response_model=SuccessResponse)
-def update_role(
+async def update_role(
     role_id: int, 
     role_in: RoleUpdate, 
     db: Session = Depends(get_db), 
     _: bool = Depends(PermissionChecker("role:update"))
 ):
-    role = crud_role.update_role(db, role_id, role_in)
+    role = await run_db(db, crud_role.update_role, role_id, role_in)
 
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
@@ -71,12 +99,12 @@ def update_role(
     return SuccessResponse(message="Role updated successfully")
 
 @router.delete("/{role_id}", response_model=SuccessResponse)
-def delete_role(
+async def delete_role(
     role_id: int, 
     db: Session = Depends(get_db), 
     _: bool = Depends(PermissionChecker("role:delete"))
 ):
-    role = crud_role.delete_role(db, role_id)
+    role = await run_db(db, crud_role.delete_role, role_id)
 
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
@@ -84,14 +112,14 @@ def delete_role(
     return SuccessResponse(message="Role deleted successfully")
 
 @router.post("/{role_id}/users/{user_id}", response_model=SuccessResponse)
-def assign_role_to_user(
+async def assign_role_to_user(
     role_id: int, 
     user_id: int, 
     db: Session = Depends(get_db), 
     current_user: User = Depends(get_current_user), 
     _: bool = Depends(PermissionChecker("role:assign"))
 ):  
-    role = crud_role.get_role(db, role_id)
+    role = await run_db(db, crud_role.get_role, role_id)
 
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
@@ -102,7 +130,7 @@ def assign_role_to_user(
             detail="Not enough permissions"
         )
     
-    user = crud_role.assign_role(db, user_id, role_id)
+    user = await run_db(db, crud_role.assign_role, user_id, role_id)
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -110,18 +138,18 @@ def assign_role_to_user(
     return SuccessResponse(message="Role assigned to user successfully")
 
 @router.put("/{role_id}/permissions", response_model=SuccessResponse)
-def update_role_permissions(
+async def update_role_permissions(
     role_id: int,
     role_permission_in: RolePermissionUpdate,
     db: Session = Depends(get_db),
     _: bool = Depends(PermissionChecker("role:update_permissions"))
 ):
-    role = crud_role.get_role(db, role_id)
+    role = await run_db(db, crud_role.get_role, role_id)
 
     if not role:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
 
-    updated_role = crud_role.sync_permissions(db, role_id, role_permission_in.permission_ids)
+    updated_role = await run_db(db, crud_role.sync_permissions, role_id, role_permission_in.permission_ids)
 
     if updated_role is None:
         raise HTTPException(status_code=400, detail="Failed to update permissions")
@@ -1,16 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, run_db
 from app.crud import user as crud_user
-from app.schemas.user import User, UserCreate, UserUpdate, CurrentUser, UserPage, UpdatePassword
+from app.core.security import get_password_hash_async
+from app.crud.pagination import CountMode, total_pages
+from app.core.response_cache import cached_page, cached_response, response_cache
+from app.schemas.user import (
+    User, UserCreate, UserUpdate, CurrentUser, UserPage, UserSummaryPage, UserView, UpdatePassword
+)
 from app.schemas.response import SuccessResponse
-from app.dependencies import get_current_user, PermissionChecker
+from app.dependencies import Principal, get_current_principal, get_current_user, PermissionChecker
 
 router = APIRouter()
 
 @router.get("/me", response_model=CurrentUser)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     return CurrentUser(
         id=current_user.id, 
         username=current_user.username, 
@@ -18,45 +23,64 @@ def get_me(current_user: User = Depends(get_current_user)):
     )
 
 @router.post("", response_model=SuccessResponse, status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
     user_in: UserCreate, 
     db: Session = Depends(get_db), 
     _: bool = Depends(PermissionChecker("user:create"))
 ):
-    crud_user.create_user(db, user=user_in)
+    hashed_password = await get_password_hash_async(user_in.password)
+    await run_db(db, crud_user.create_user, user=user_in, hashed_password=hashed_password)
 
     return SuccessResponse(message="User created successfully")
 
-@router.get("", response_model=UserPage)
-def get_users(
-    db: Session = Depends(get_db), 
+@router.get("", response_model=UserPage | UserSummaryPage)
+async def get_users(
+    db: Session = Depends(get_read_db), 
     page: int = 1,
     limit: int = 10,
     search: str | None = None,
+    cursor: int | None = None,
+    count: CountMode | None = None,
+    view: UserView = "full",
     _: bool = Depends(PermissionChecker("user:view_all"))
 ):
-    offset = (page - 1) * limit
+    offset = (page - 1) * limit if cursor is None else 0
+
+    cache_params = dict(page=page, limit=limit, search=search, cursor=cursor, count=count, view=view)
+    lookup = await response_cache.get("users", cache_params)
+    if lookup.cached is not None:
+        return cached_response(lookup.cached)
+
+    if view == "compact":
+        users, total = await run_db(db, crud_user.get_user_summaries_page, skip=offset, limit=limit, search=search, cursor=cursor, count=count)
+        page_schema = UserSummaryPage
+    else:
+        users, total = await run_db(db, crud_user.get_users_page, skip=offset, limit=limit, search=search, cursor=cursor, count=count)
+        page_schema = UserPage
 
-    users = crud_user.get_users(db, skip=offset, limit=limit, search=search)
-    total = crud_user.get_total_users(db, search=search)
+    next_cursor = None
+    if len(users) == limit:
+        next_cursor = users[-1]["id"] if view == "compact" else users[-1].id
 
-    return UserPage(
+    user_page = page_schema(
         users=users,
         total=total,
         page=page,
         limit=limit,
-        total_pages=(total + limit - 1) // limit
+        total_pages=total_pages(total, limit),
+        next_cursor=next_cursor
     )
+    return await cached_page(lookup, user_page)
 
 @router.get("/{user_id}", response_model=User)
-def get_user(
+async def get_user(
     user_id: int, 
-    db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db), 
+    principal: Principal = Depends(get_current_principal),
     _: bool = Depends(PermissionChecker("user:view"))
 ):
-    if current_user.role.name == "ADMIN" or current_user.id == user_id:
-        user = crud_user.get_user(db, user_id)
+    if principal.is_admin or principal.id == user_id:
+        user = await run_db(db, crud_user.get_user, user_id)
 
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -66,7 +90,7 @@ def get_user(
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
 
 @router.patch("/{user_id}", response_model=SuccessResponse)
-def update_user(
+async def update_user(
     user_id: int,
     user_in: UserUpdate,
     db: Session = Depends(get_db),
@@ -82,14 +106,14 @@ def update_user(
             detail="Not enough permissions",
         )
 
-    user = crud_user.update_user(db, user_id=user_id, user=user_in)
+    user = await run_db(db, crud_user.update_user, user_id=user_id, user=user_in)
     if not user:
         raise HTTPException(status_code=404, detail="User Not Found")
         
     return SuccessResponse(message="User updated successfully")
 
 @router.patch("/{user_id}/password", response_model=SuccessResponse)
-def update_user_password(
+async def update_user_password(
     user_id: int,
     body: UpdatePassword,
     db: Session = Depends(get_db),
@@ -105,19 +129,20 @@ def update_user_password(
             detail="Not enough permissions",
         )
 
-    user = crud_user.update_password(db, user_id=user_id, password=body.password)
+    hashed_password = await get_password_hash_async(body.password)
+    user = await run_db(db, crud_user.update_password, user_id=user_id, hashed_password=hashed_password)
     if not user:
         raise HTTPException(status_code=404, detail="User Not Found")
         
     return SuccessResponse(message="User password updated successfully")
 
 @router.delete("/{user_id}", response_model=SuccessResponse)
-def delete_user(
+async def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     _: bool = Depends(PermissionChecker("user:delete"))
 ):
-    user = crud_user.delete_user(db, user_id)
+    user = await run_db(db, crud_user.delete_user, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User Not Found")
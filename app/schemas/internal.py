@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class PoolStatus(BaseModel):
+    name: str
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None
+    wait_seconds_total: Optional[float] = None
+    wait_seconds_max: Optional[float] = None
+
+class CacheStats(BaseModel):
+    namespace: str
+    hits: int
+    misses: int
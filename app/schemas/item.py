@@ -23,9 +23,28 @@ class Item(ItemBase):
     class Config:
         from_attributes = True
 
+class ItemAdjust(BaseModel):
+    delta: int
+    floor_at_zero: bool = False
+    reason: Optional[str] = None
+
+class ItemStock(BaseModel):
+    id: int
+    quantity: int
+
 class ItemPage(BaseModel):
     items: list[Item]
-    total: int
+    total: Optional[int] = None
     page: int
     limit: int
-    total_pages: int
\ No newline at end of file
+    total_pages: Optional[int] = None
+    next_cursor: Optional[int] = None
+
+class ItemImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+class ItemImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ItemImportError]
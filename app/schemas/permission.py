@@ -20,7 +20,8 @@ class PermissionUpdate(BaseModel):
 
 class PermissionPage(BaseModel):
     permissions: List[Permission]
-    total: int
+    total: Optional[int] = None
     page: int
     limit: int
-    total_pages: int
\ No newline at end of file
+    total_pages: Optional[int] = None
+    next_cursor: Optional[int] = None
\ No newline at end of file
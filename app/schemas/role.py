@@ -22,10 +22,11 @@ class Role(RoleBase):
 
 class RolePage(BaseModel):
     roles: List[Role]
-    total: int
+    total: Optional[int] = None
     page: int
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[int] = None
 
 class RolePermissionUpdate(BaseModel):
     permission_ids: List[int]
\ No newline at end of file
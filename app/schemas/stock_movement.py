@@ -0,0 +1,30 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Optional, List
+
+class StockMovementBase(BaseModel):
+    delta: int
+    reason: Optional[str] = None
+
+class StockMovementCreate(StockMovementBase):
+    item_id: int
+
+class StockMovementBatch(BaseModel):
+    movements: List[StockMovementCreate] = Field(min_length=1)
+    floor_at_zero: bool = False
+
+class StockMovement(StockMovementBase):
+    id: int
+    item_id: int
+    sku: Optional[str] = None
+    quantity_after: int
+    created_by: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class StockMovementPage(BaseModel):
+    movements: List[StockMovement]
+    limit: int
+    next_cursor: Optional[int] = None
@@ -7,4 +7,9 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: Optional[str] = None
-    role: Optional[str] = None
\ No newline at end of file
+    role: Optional[str] = None
+    user_id: Optional[int] = None
+    role_id: Optional[int] = None
+    permissions: Optional[frozenset[str]] = None
+    permissions_version: Optional[int] = None
+    token_version: Optional[int] = None
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Literal, Optional
 from .rbac import Role
 
 class UserBase(BaseModel):
@@ -28,10 +28,27 @@ class User(UserBase):
 
 class UserPage(BaseModel):
     users: list[User]
-    total: int
+    total: Optional[int] = None
     page: int
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[int] = None
+
+# "compact" lists users with their role name instead of the nested role
+UserView = Literal["full", "compact"]
+
+class UserSummary(UserBase):
+    id: int
+    role_id: Optional[int] = None
+    role_name: Optional[str] = None
+
+class UserSummaryPage(BaseModel):
+    users: list[UserSummary]
+    total: Optional[int] = None
+    page: int
+    limit: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[int] = None
 
 class UpdatePassword(BaseModel):
     password: str
\ No newline at end of file
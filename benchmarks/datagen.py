@@ -0,0 +1,105 @@
+"""Synthetic data generator for load tests.
+
+Creates the schema and the RBAC seed (seed.py), then bulk-inserts --users
+staff users with --items-per-user items each into DATABASE_URL. Users share
+one password hash so generation does not spend its time in bcrypt. Item
+names and SKUs come from a skewed category/product mix, so search terms
+have realistic selectivity: a few categories are common, most are rare.
+
+    DATABASE_URL=postgresql://localhost/inventory_load python -m benchmarks.datagen --users 1000 --items-per-user 100
+
+Run it against an empty database; generated usernames are load_user_<n>.
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.security import get_password_hash  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.models.item import Item  # noqa: E402
+from app.models.rbac import Role  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+PASSWORD = "load-password"
+
+# (SKU prefix, category word, relative weight)
+CATEGORIES = [
+    ("ELC", "cable", 30), ("ELC", "adapter", 18), ("HW", "screw", 14), ("HW", "bolt", 10),
+    ("OFF", "paper", 8), ("OFF", "toner", 6), ("FUR", "chair", 4), ("FUR", "desk", 3),
+    ("PKG", "box", 3), ("PKG", "tape", 2), ("SAF", "glove", 1), ("SAF", "helmet", 1),
+]
+ADJECTIVES = ["basic", "heavy duty", "compact", "premium", "steel", "black", "white", "large", "small", "recycled"]
+
+def _item_rows(rng: random.Random, owner_id: int, count: int, serial):
+    weights = [weight for _, _, weight in CATEGORIES]
+    for category in rng.choices(CATEGORIES, weights=weights, k=count):
+        prefix, word, _ = category
+        number = next(serial)
+        yield {
+            "name": f"{rng.choice(ADJECTIVES)} {word} {rng.randint(1, 500)}",
+            "description": f"Synthetic {word}",
+            "sku": f"{prefix}-{word[:3].upper()}-{number:08d}",
+            # Long tail: most items are low stock, a few are bulk
+            "quantity": int(rng.lognormvariate(3, 1.2)),
+            "owner_id": owner_id,
+        }
+
+def generate(users: int, items_per_user: int, seed: int = 42, batch_size: int = 5000) -> dict:
+    import seed as rbac_seed
+
+    Base.metadata.create_all(bind=engine)
+    rbac_seed.seed_data()
+
+    with SessionLocal() as db:
+        staff_role_id = db.query(Role.id).filter(Role.name == "STAFF").scalar()
+
+    rng = random.Random(seed)
+    password = get_password_hash(PASSWORD)
+    serial = itertools.count(1)
+    started = time.perf_counter()
+
+    with engine.begin() as connection:
+        user_ids = []
+        for start in range(0, users, batch_size):
+            rows = [
+                {
+                    "username": f"load_user_{index}",
+                    "email": f"load_user_{index}@example.com",
+                    "password": password,
+                    "role_id": staff_role_id,
+                }
+                for index in range(start, min(start + batch_size, users))
+            ]
+            user_ids += connection.execute(insert(User).returning(User.id), rows).scalars().all()
+
+        batch = []
+        for user_id in user_ids:
+            batch += _item_rows(rng, user_id, items_per_user, serial)
+            if len(batch) >= batch_size:
+                connection.execute(insert(Item), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(Item), batch)
+
+    return {"users": users, "items": users * items_per_user, "seconds": time.perf_counter() - started}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--items-per-user", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = generate(args.users, args.items_per_user, seed=args.seed)
+    print(f"inserted {result['users']} users and {result['items']} items in {result['seconds']:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Item list pages: ORM instances vs. column-projected rows.
+
+Seeds --items items into a throwaway SQLite database and, for each page
+size, loads one page and builds the ItemPage response model both ways.
+Reports median time and peak traced memory per page.
+
+    python -m benchmarks.item_list_query --items 20000 --page-sizes 100 1000 5000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.crud import item as crud_item  # noqa: E402
+from app.crud.pagination import paginate  # noqa: E402
+from app.db.schema import create_schema  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.item import Item  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.item import ItemPage  # noqa: E402
+
+def setup_database(items: int):
+    create_schema()
+    with engine.begin() as connection:
+        owner_id = connection.execute(
+            insert(User).returning(User.id), {"username": "bench", "email": "bench@example.com", "password": "x"}
+        ).scalar_one()
+        connection.execute(insert(Item), [
+            {"name": f"Item {index}", "description": "Benchmark item with a realistic description",
+             "sku": f"BENCH-{index:07d}", "quantity": index % 100, "owner_id": owner_id}
+            for index in range(items)
+        ])
+
+def orm_page(db, limit):
+    # The previous implementation: full Item instances
+    return paginate(db.query(Item), Item.id, limit=limit)
+
+def lean_page(db, limit):
+    return crud_item.get_items_page(db, limit=limit)
+
+def build(strategy, limit):
+    with SessionLocal() as db:
+        items, total = strategy(db, limit)
+        return ItemPage(items=items, total=total, page=1, limit=limit)
+
+def measure(strategy, limit, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build(strategy, limit)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    build(strategy, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings) * 1000, peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_database(args.items)
+    print(f"{'limit':>6} {'strategy':>8} {'ms/page':>9} {'peak KiB':>10}")
+    for limit in args.page_sizes:
+        for name, strategy in (("orm", orm_page), ("lean", lean_page)):
+            ms, peak = measure(strategy, limit, args.repeat)
+            print(f"{limit:>6} {name:>8} {ms:>9.2f} {peak:>10.0f}")
+
+if __name__ == "__main__":
+    main()
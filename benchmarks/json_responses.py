@@ -0,0 +1,156 @@
+"""List response serialization: FastAPI's default path vs. FAST_JSON_RESPONSES.
+
+Seeds --items items into a throwaway SQLite database and measures, for
+pages of --page-size items:
+
+- encode: turning an already built ItemPage into response bytes, via
+  FastAPI's response_model path + JSONResponse vs. page_response()
+- request: a full GET /api/items through the ASGI app, with the flag off
+  and on
+
+The app picks its response class when main is imported, so each request
+mode runs in its own interpreter with FAST_JSON_RESPONSES set in the
+environment and an app built under that setting.
+
+    python -m benchmarks.json_responses --items 5000 --page-size 1000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app reads DATABASE_URL and FAST_JSON_RESPONSES when it is imported, so
+# main() sets them first and everything from app is imported inside the
+# functions below.
+
+def setup_database(items: int):
+    import seed
+    from sqlalchemy import insert
+
+    from app.db.schema import create_schema
+    from app.db.session import SessionLocal, engine
+    from app.models.item import Item
+    from app.models.user import User
+
+    create_schema()
+    seed.seed_bulk()
+    with SessionLocal() as db:
+        admin_id = db.query(User.id).filter(User.username == "admin").scalar()
+    with engine.begin() as connection:
+        connection.execute(insert(Item), [
+            {"name": f"Item {index}", "description": "Benchmark item with a realistic description",
+             "sku": f"BENCH-{index:07d}", "quantity": index % 100, "owner_id": admin_id}
+            for index in range(items)
+        ])
+
+async def timed(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+async def bench_encode(page_size: int, repeat: int):
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    from app.core.config import settings
+    from app.core.responses import page_response
+    from app.crud import item as crud_item
+    from app.db.session import SessionLocal
+    from app.schemas.item import ItemPage
+
+    with SessionLocal() as db:
+        items, total = crud_item.get_items_page(db, limit=page_size)
+        page = ItemPage(items=items, total=total, page=1, limit=page_size, total_pages=1)
+
+    field = create_model_field(name="response", type_=ItemPage, mode="serialization")
+
+    async def fastapi_default():
+        content = await serialize_response(field=field, response_content=page)
+        JSONResponse(content)
+
+    async def fast_path():
+        page_response(page)
+
+    default_ms = await timed(fastapi_default, repeat)
+    # page_response() checks the flag on every call
+    settings.FAST_JSON_RESPONSES = True
+    try:
+        fast_ms = await timed(fast_path, repeat)
+    finally:
+        settings.FAST_JSON_RESPONSES = False
+    print(f"encode {page_size}-item page: default {default_ms:.2f} ms, fast {fast_ms:.2f} ms")
+
+async def bench_requests(page_size: int, repeat: int):
+    import httpx
+
+    from app.core.config import settings
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/auth/login", data={"username": "admin", "password": "password123"})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        url = f"/api/items?limit={page_size}&count=none"
+
+        # Warm up the route, the session and the response class before timing
+        for _ in range(3):
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200, response.text
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+
+    print(
+        f"GET {url} fast={settings.FAST_JSON_RESPONSES} ({app.router.default_response_class.__name__}): "
+        f"p50 {statistics.median(timings) * 1000:.2f} ms"
+    )
+
+def run_requests_mode(args, fast: bool):
+    # A fresh interpreter, so main builds its app under this setting
+    command = [
+        sys.executable, "-m", "benchmarks.json_responses", "--requests-only",
+        "--page-size", str(args.page_size), "--repeat", str(args.repeat),
+    ]
+    env = {**os.environ, "FAST_JSON_RESPONSES": "true" if fast else "false"}
+    subprocess.run(command, env=env, check=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument(
+        "--requests-only", action="store_true",
+        help="time GET /api/items against an already seeded DATABASE_URL with the current environment",
+    )
+    args = parser.parse_args()
+
+    if args.requests_only:
+        asyncio.run(bench_requests(args.page_size, args.repeat))
+        return
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ["FAST_JSON_RESPONSES"] = "false"
+
+    setup_database(args.items)
+    asyncio.run(bench_encode(args.page_size, args.repeat))
+
+    for fast in (False, True):
+        run_requests_mode(args, fast)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""In-process load test with a JSON report.
+
+Generates a synthetic dataset (benchmarks.datagen) into a throwaway SQLite
+database, or into --database-url (which must be empty and disposable), and
+drives the real app through httpx's ASGI transport. Every scenario reports
+requests, errors, throughput and p50/p99 latency; the report also records
+the git revision and settings so runs can be diffed across versions.
+
+    python -m benchmarks.load_bench --users 200 --items-per-user 100 --output report.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app reads DATABASE_URL when it is imported, so main() sets it first
+# and everything from app is imported inside the functions below.
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+async def run_scenario(client, make_request, total: int, concurrency: int) -> dict:
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index):
+        method, url, kwargs = make_request(index)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ok = sum(count for status, count in statuses.items() if status < 400)
+    return {
+        "requests": total,
+        "ok": ok,
+        "errors": total - ok,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(ok / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+async def login(client, username: str, password: str) -> dict:
+    response = await client.post("/api/auth/login", data={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def build_scenarios(args, admin: dict, staff: dict, item_ids: list[int], staff_role_id: int) -> dict:
+    from benchmarks import datagen
+
+    rng = random.Random(7)
+    limit = args.page_size
+    scenarios = {
+        "login": lambda i: ("POST", "/api/auth/login", {
+            "data": {"username": f"load_user_{rng.randrange(args.users)}", "password": datagen.PASSWORD},
+        }),
+    }
+
+    for depth in args.depths:
+        scenarios[f"list_items_admin_page_{depth}"] = lambda i, depth=depth: (
+            "GET", f"/api/items?page={depth}&limit={limit}", {"headers": admin}
+        )
+        scenarios[f"list_items_admin_cursor_page_{depth}"] = lambda i, depth=depth: (
+            "GET", f"/api/items?cursor={max(item_ids) - (depth - 1) * limit + 1}&limit={limit}&count=none", {"headers": admin}
+        )
+    scenarios["list_items_staff_page_1"] = lambda i: ("GET", f"/api/items?limit={limit}", {"headers": staff})
+
+    words = [word for _, word, _ in datagen.CATEGORIES]
+    scenarios["search_items_admin"] = lambda i: (
+        "GET", f"/api/items?search={rng.choice(words)}&limit={limit}", {"headers": admin}
+    )
+
+    scenarios["create_item_staff"] = lambda i: ("POST", "/api/items", {
+        "headers": staff,
+        "json": {"name": f"load item {i}", "description": "load test", "sku": f"LOAD-{time.time_ns()}-{i}", "quantity": 1},
+    })
+    scenarios["update_item_admin"] = lambda i: ("PUT", f"/api/items/{rng.choice(item_ids)}", {
+        "headers": admin, "json": {"quantity": rng.randint(0, 100)},
+    })
+    scenarios["adjust_item_admin"] = lambda i: ("POST", f"/api/items/{rng.choice(item_ids)}/adjust", {
+        "headers": admin, "json": {"delta": rng.choice([-1, 1])},
+    })
+    scenarios["assign_role_admin"] = lambda i: ("POST", f"/api/roles/{staff_role_id}/users/{rng.randint(3, args.users + 2)}", {
+        "headers": admin,
+    })
+
+    if args.scenarios:
+        scenarios = {name: make for name, make in scenarios.items() if name in args.scenarios}
+    return scenarios
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args, app) -> dict:
+    import httpx
+
+    from app.db.session import SessionLocal
+    from benchmarks import datagen
+    from app.models.item import Item
+    from app.models.rbac import Role
+
+    with SessionLocal() as db:
+        item_ids = [item_id for (item_id,) in db.query(Item.id).all()]
+        staff_role_id = db.query(Role.id).filter(Role.name == "STAFF").scalar()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+        admin = await login(client, "admin", "password123")
+        staff = await login(client, "load_user_0", datagen.PASSWORD)
+
+        results = {}
+        for name, make_request in build_scenarios(args, admin, staff, item_ids, staff_role_id).items():
+            results[name] = await run_scenario(client, make_request, args.requests, args.concurrency)
+            print(f"{name:<40} p50 {results[name]['p50_ms']:>9.2f} ms  p99 {results[name]['p99_ms']:>9.2f} ms  "
+                  f"{results[name]['throughput_rps']:>8.1f} req/s", file=sys.stderr)
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--items-per-user", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 10, 100], help="page numbers to list")
+    parser.add_argument("--scenarios", nargs="+", help="run only these scenarios")
+    parser.add_argument("--database-url")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load.db')}"
+
+    from app.core.config import settings
+    from benchmarks import datagen
+
+    # Keep stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        generated = datagen.generate(args.users, args.items_per_user)
+    from main import app
+
+    scenarios = asyncio.run(run(args, app))
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "database": settings.DATABASE_URL.split("://", 1)[0],
+        "config": {
+            "database_async": settings.DATABASE_ASYNC,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "response_cache": settings.RESPONSE_CACHE_BACKEND,
+            "users": args.users,
+            "items_per_user": args.items_per_user,
+            "items": generated["items"],
+            "requests_per_scenario": args.requests,
+            "concurrency": args.concurrency,
+            "page_size": args.page_size,
+        },
+        "scenarios": scenarios,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
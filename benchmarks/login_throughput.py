@@ -0,0 +1,105 @@
+"""Login throughput vs. password hashing pool size.
+
+Drives POST /api/auth/login in-process against a throwaway SQLite database
+and reports successful logins per second, p50/p99 latency and 503
+rejections for each worker count.
+
+    python -m benchmarks.login_throughput --workers 1 2 4 8 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.core.worker_pool import BoundedExecutor  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.models.rbac import Role  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+USERNAME = "bench"
+PASSWORD = "bench-password"
+
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    role = Role(name="BENCH", description="Benchmark role")
+    db.add(role)
+    db.flush()
+    db.add(User(
+        username=USERNAME,
+        email="bench@example.com",
+        password=security.get_password_hash(PASSWORD),
+        role_id=role.id,
+    ))
+    db.commit()
+    db.close()
+
+async def run(app, workers: int, max_pending: int, total: int, concurrency: int):
+    security.password_pool.shutdown()
+    security.password_pool = BoundedExecutor(
+        max_workers=workers, max_pending=max_pending, name="password-hash"
+    )
+
+    latencies = []
+    statuses = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/auth/login", data={"username": USERNAME, "password": PASSWORD}
+                )
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "workers": workers,
+        "ok": statuses.get(200, 0),
+        "rejected": statuses.get(503, 0),
+        "throughput": statuses.get(200, 0) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-pending", type=int, default=64)
+    args = parser.parse_args()
+
+    setup_database()
+    from main import app
+
+    print(f"{'workers':>7} {'ok':>5} {'503':>5} {'login/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for workers in args.workers:
+        result = asyncio.run(run(app, workers, args.max_pending, args.requests, args.concurrency))
+        print(
+            f"{result['workers']:>7} {result['ok']:>5} {result['rejected']:>5} "
+            f"{result['throughput']:>9.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+        )
+
+    security.password_pool.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Role listing: joinedload + LIMIT vs. selectinload.
+
+Builds a throwaway SQLite database (or uses --database-url, which must be
+disposable) with --roles roles drawn from a catalogue of --permissions
+permissions and times GET /api/roles style page loads both ways. It reports
+ms per page and the number of statements and result rows for each.
+
+    python -m benchmarks.role_listing --roles 500 --permissions 2000 --per-role 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app reads DATABASE_URL when it is imported, so main() sets it first
+# and everything from app is imported inside the functions below.
+
+def setup_database(args):
+    from sqlalchemy import insert
+
+    from app.db.session import engine
+    from app.models.base import Base
+    from app.models.rbac import Permission, Role, role_permission
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    with engine.begin() as connection:
+        connection.execute(insert(Permission), [
+            {"id": index, "name": f"resource_{index}:action", "description": f"Permission {index}"}
+            for index in range(1, args.permissions + 1)
+        ])
+        connection.execute(insert(Role), [
+            {"id": index, "name": f"ROLE_{index}", "description": f"Role {index}"}
+            for index in range(1, args.roles + 1)
+        ])
+        permission_ids = range(1, args.permissions + 1)
+        connection.execute(insert(role_permission), [
+            {"role_id": role_id, "permission_id": permission_id}
+            for role_id in range(1, args.roles + 1)
+            for permission_id in rng.sample(permission_ids, min(args.per_role, args.permissions))
+        ])
+
+def joined_page(db, limit):
+    from sqlalchemy.orm import joinedload
+
+    from app.crud.pagination import paginate
+    from app.models.rbac import Role
+
+    # The previous implementation
+    query = db.query(Role).options(joinedload(Role.permissions))
+    return paginate(query, Role.id, skip=limit, limit=limit, count="exact")
+
+def selectin_page(db, limit):
+    from app.crud import role as crud_role
+
+    return crud_role.get_roles_page(db, skip=limit, limit=limit, count="exact")
+
+def measure(strategy, limit, repeat):
+    from sqlalchemy import event
+
+    from app.db.session import SessionLocal, engine
+
+    timings = []
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            started = time.perf_counter()
+            roles, _ = strategy(db, limit)
+            sum(len(role.permissions) for role in roles)
+            timings.append(time.perf_counter() - started)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with SessionLocal() as db:
+            strategy(db, limit)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # Replay the captured SQL to count the rows each strategy pulls over
+    with engine.connect() as connection:
+        rows = sum(len(connection.exec_driver_sql(sql, params).all()) for sql, params in statements)
+    return statistics.median(timings) * 1000, len(statements), rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roles", type=int, default=500)
+    parser.add_argument("--permissions", type=int, default=2000)
+    parser.add_argument("--per-role", type=int, default=200, help="permissions assigned to each role")
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    print(f"seeding {args.roles} roles x {args.permissions} permissions, {args.per_role} per role ...")
+    setup_database(args)
+
+    print(f"{'limit':>5} {'strategy':>10} {'ms/page':>9} {'stmts':>6} {'rows':>7}")
+    for limit in args.limits:
+        for name, strategy in (("joinedload", joined_page), ("selectin", selectin_page)):
+            ms, statements, rows = measure(strategy, limit, args.repeat)
+            print(f"{limit:>5} {name:>10} {ms:>9.2f} {statements:>6} {rows:>7}")
+
+if __name__ == "__main__":
+    main()
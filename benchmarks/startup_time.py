@@ -0,0 +1,73 @@
+"""Cold-start time of the app.
+
+Starts a fresh interpreter per run and measures importing main, the
+lifespan startup (pool and cache warm-up) and the first authenticated
+request, with and without STARTUP_WARMUP. Uses a throwaway SQLite database
+unless --database-url is given.
+
+    python -m benchmarks.startup_time --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    ready = time.perf_counter()
+    token = client.post("/api/auth/login", data={"username": "admin", "password": "password123"}).json()["access_token"]
+    logged_in = time.perf_counter()
+    response = client.get("/api/items", headers={"Authorization": f"Bearer {token}"})
+    first_request = time.perf_counter()
+    assert response.status_code == 200, response.text
+
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "lifespan_ms": (ready - imported) * 1000,
+    "login_ms": (logged_in - ready) * 1000,
+    "first_request_ms": (first_request - logged_in) * 1000,
+}))
+"""
+
+def prepare(env: dict) -> None:
+    # Schema and seed happen once, outside the measured runs
+    subprocess.run([sys.executable, "seed.py", "--bulk"], cwd=ROOT, env=env, check=True, capture_output=True)
+
+def measure(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'startup.db')}"
+    prepare(env)
+
+    print(f"{'warmup':>6} {'import ms':>10} {'lifespan ms':>12} {'login ms':>9} {'first GET ms':>13}")
+    for warmup in ("false", "true"):
+        runs = [measure({**env, "STARTUP_WARMUP": warmup}) for _ in range(args.runs)]
+        medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(
+            f"{warmup:>6} {medians['import_ms']:>10.1f} {medians['lifespan_ms']:>12.1f} "
+            f"{medians['login_ms']:>9.1f} {medians['first_request_ms']:>13.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,47 @@
-from fastapi import FastAPI
-from app.routes import item, auth, user, permission, role
-from app.db.session import engine
-from app.models.base import Base
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.routes import item, auth, user, permission, role, internal
+from app.core.config import settings
+from app.core.responses import default_response_class
+from app.crud.role import warm_permission_cache
+from app.db.session import pin_reads_to_primary, replicas, run_in_new_session, warm_pools
+from app.core.worker_pool import PoolSaturated
+from app.core.metrics import QueryStats, current_query_stats, request_metrics
+from app.dependencies import SAFE_METHODS, PermissionChecker
 from fastapi.middleware.cors import CORSMiddleware
 
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+
+# The schema is managed explicitly (python -m app.db.schema), so importing
+# this module never touches the database.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.STARTUP_WARMUP:
+        try:
+            await warm_pools()
+            await run_in_new_session(warm_permission_cache)
+        except Exception:
+            # Serve anyway; connections are opened on demand once the database is back
+            logger.warning("Database warm-up failed", exc_info=True)
+        app.openapi()
 
-app = FastAPI(title="Inventory API", docs_url="/api/docs", openapi_url="/api/openapi.json")
+    health_checks = asyncio.create_task(replicas.monitor()) if replicas else None
+    yield
+    if health_checks is not None:
+        health_checks.cancel()
+
+app = FastAPI(
+    title="Inventory API",
+    docs_url="/api/docs",
+    openapi_url="/api/openapi.json",
+    lifespan=lifespan,
+    default_response_class=default_response_class(),
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,11 +54,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if replicas:
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_reads_to_primary(request, response)
+        return response
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    query_stats = QueryStats()
+    token = current_query_stats.set(query_stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_query_stats.reset(token)
+
+    # Label by route template so /api/items/1 and /api/items/2 share a series
+    route = request.scope.get("route")
+    request_metrics.observe(
+        request.method,
+        route.path if route is not None else "unmatched",
+        response.status_code,
+        time.perf_counter() - started,
+        query_stats,
+    )
+    return response
+
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(item.router, prefix="/api/items", tags=["Items"])
 app.include_router(user.router, prefix="/api/users", tags=["Users"])
 app.include_router(role.router, prefix="/api/roles", tags=["Roles"])
 app.include_router(permission.router, prefix="/api/permissions", tags=["Permissions"])
+app.include_router(internal.router, prefix="/api/internal", tags=["Internal"])
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(_: bool = Depends(PermissionChecker("system:metrics"))):
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 async def root():
@@ -1,8 +1,16 @@
+import argparse
+import json
+import os
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
+from app.db.schema import create_schema
 from app.db.session import SessionLocal, engine
-from app.models.base import Base
-from app.models.rbac import Role, Permission
+from app.models.rbac import Role, Permission, role_permission
 from app.models.user import User
+from app.core.response_cache import response_cache
 from app.core.security import get_password_hash
 from app.models import *
 
@@ -28,11 +36,13 @@ def seed_data():
         {"name": "role:assign", "desc": "Bisa menambahkan role ke user"},
         {"name": "role:add_permission", "desc": "Bisa menambahkan permission ke role"},
         {"name": "role:remove_permission", "desc": "Bisa menghapus permission dari role"},
+        {"name": "role:update_permissions", "desc": "Bisa mengatur ulang permission role"},
         {"name": "user:view_all", "desc": "Bisa melihat daftar user"},
         {"name": "user:view", "desc": "Bisa melihat satu user"},
         {"name": "user:create", "desc": "Bisa menambah user baru"},
         {"name": "user:update", "desc": "Bisa mengedit user"},
         {"name": "user:delete", "desc": "Bisa menghapus user"},
+        {"name": "system:metrics", "desc": "Bisa melihat metrik sistem"},
     ]
 
     perms_obj = {}
@@ -99,6 +109,104 @@ def seed_data():
     print("Seed data success")
     db.close()
 
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "seed.json")
+
+def seed_bulk(path: str = DEFAULT_FIXTURE) -> dict:
+    # Set-based, idempotent load of a fixture file: one INSERT ... ON CONFLICT
+    # DO NOTHING per table, all in one transaction. Existing rows are left
+    # as they are, so re-running only adds what is missing. Roles that gain
+    # permissions get their versions bumped, which retires tokens and ETags
+    # issued for the old permission set.
+    with open(path) as file:
+        fixture = json.load(file)
+
+    insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    timings = {}
+    inserted = {}
+
+    def step(name, rows, stmt, returning):
+        # rowcount is unreliable for executemany (psycopg2), so count the
+        # rows RETURNING yields: only the ones actually inserted
+        started = time.perf_counter()
+        written = []
+        if rows:
+            written = connection.execute(stmt.on_conflict_do_nothing().returning(returning), rows).scalars().all()
+        inserted[name] = len(written)
+        timings[name] = time.perf_counter() - started
+        return written
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        permissions = fixture.get("permissions", [])
+        step("permissions", permissions, insert(Permission), Permission.id)
+
+        roles = fixture.get("roles", [])
+        new_role_ids = step(
+            "roles", [{"name": r["name"], "description": r.get("description")} for r in roles], insert(Role), Role.id
+        )
+
+        role_ids = dict(connection.execute(
+            select(Role.name, Role.id).where(Role.name.in_([r["name"] for r in roles]))
+        ).all())
+        permission_ids = dict(connection.execute(select(Permission.name, Permission.id)).all())
+
+        links = []
+        for role in roles:
+            names = permission_ids if role.get("permissions") == "*" else role.get("permissions", [])
+            links += [
+                {"role_id": role_ids[role["name"]], "permission_id": permission_ids[name]}
+                for name in names
+            ]
+        # Roles created just now have no tokens or ETags to retire
+        changed_roles = set(step("role_permission", links, insert(role_permission), role_permission.c.role_id))
+        changed_roles -= set(new_role_ids)
+        if changed_roles:
+            connection.execute(
+                update(Role)
+                .where(Role.id.in_(changed_roles))
+                .values(permissions_version=Role.permissions_version + 1, version=Role.version + 1)
+            )
+
+        # Only users that do not exist yet pay for a bcrypt hash
+        users_started = time.perf_counter()
+        users = fixture.get("users", [])
+        existing = set(connection.execute(
+            select(User.username).where(User.username.in_([u["username"] for u in users]))
+        ).scalars())
+        new_users = []
+        for user in users:
+            if user["username"] in existing:
+                continue
+            if user.get("role") is not None and user["role"] not in role_ids:
+                role_ids[user["role"]] = connection.execute(select(Role.id).where(Role.name == user["role"])).scalar_one()
+            new_users.append({
+                "username": user["username"],
+                "email": user["email"],
+                "password": get_password_hash(user["password"]),
+                "role_id": role_ids.get(user.get("role")),
+            })
+        step("users", new_users, insert(User), User.id)
+        timings["users"] = time.perf_counter() - users_started
+
+    if any(inserted.values()):
+        response_cache.invalidate("permissions", "roles", "users")
+
+    timings["total"] = time.perf_counter() - started
+    return {"inserted": inserted, "seconds": timings}
+
 if __name__ == "__main__":
-    Base.metadata.create_all(bind=engine)
-    seed_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed permissions, roles and users")
+    parser.add_argument(
+        "--bulk", nargs="?", const=DEFAULT_FIXTURE, metavar="FIXTURE",
+        help="load a fixture file with set-based inserts (default: fixtures/seed.json)",
+    )
+    args = parser.parse_args()
+
+    create_schema()
+    if args.bulk:
+        report = seed_bulk(args.bulk)
+        for name, seconds in report["seconds"].items():
+            count = report["inserted"].get(name)
+            print(f"{name:<16} {seconds * 1000:>9.1f} ms" + (f"  {count} inserted" if count is not None else ""))
+    else:
+        seed_data()
\ No newline at end of file
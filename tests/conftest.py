@@ -0,0 +1,211 @@
+"""Shared fixtures: the app against a seeded local database.
+
+Set TEST_DATABASE_URL to run against a real server (e.g. a local Postgres
+database that can be dropped and recreated); by default a throwaway SQLite
+file is used. Settings are read at import time, so the environment has to
+be prepared before anything from app is imported.
+"""
+import itertools
+import os
+import tempfile
+from contextlib import contextmanager
+
+os.environ["DATABASE_URL"] = os.environ.get(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+# The minimum bcrypt cost keeps logins in the fixtures fast
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.cache import permission_cache, token_version_cache  # noqa: E402
+from app.core.response_cache import response_cache  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.db import session  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.models.item import Item  # noqa: E402
+from app.models.rbac import Permission, Role  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+PASSWORD = "password123"
+
+def _seed_fixtures():
+    # On top of fixtures/seed.json: extra roles and users so that per-row
+    # lazy loads show up as extra statements, and items for admin and staff.
+    db = session.SessionLocal()
+    permissions = db.query(Permission).all()
+    staff_role = db.query(Role).filter(Role.name == "STAFF").one()
+
+    roles = [staff_role]
+    for index in range(3):
+        role = Role(name=f"TEAM_{index}", description=f"Team {index}", permissions=permissions[index::3])
+        db.add(role)
+        roles.append(role)
+    db.flush()
+
+    password = get_password_hash(PASSWORD)
+    for index in range(8):
+        db.add(User(
+            username=f"user_{index}",
+            email=f"user_{index}@company.com",
+            password=password,
+            role_id=roles[index % len(roles)].id,
+        ))
+
+    owners = db.query(User).filter(User.username.in_(["admin", "staff_joko"])).all()
+    for owner in owners:
+        for index in range(15):
+            db.add(Item(
+                name=f"{owner.username} widget {index}",
+                description="Seeded item",
+                sku=f"{owner.username.upper()}-{index:03d}",
+                quantity=10,
+                owner_id=owner.id,
+            ))
+    db.commit()
+    db.close()
+
+@pytest.fixture(scope="session")
+def app():
+    import seed
+    from main import app
+
+    Base.metadata.drop_all(bind=session.engine)
+    Base.metadata.create_all(bind=session.engine)
+    seed.seed_bulk()
+    _seed_fixtures()
+    return app
+
+@pytest.fixture(scope="session")
+def client(app):
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture(scope="session")
+def login(client):
+    # login("user_1") -> Authorization headers for that user
+    def log_in(username: str) -> dict:
+        response = client.post("/api/auth/login", data={"username": username, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return log_in
+
+@pytest.fixture(scope="session")
+def admin_headers(login):
+    return login("admin")
+
+@pytest.fixture(scope="session")
+def staff_headers(login):
+    return login("staff_joko")
+
+class Rows:
+    # Ids of the seeded rows by their natural keys, for tests that only read
+    # them, and fresh rows for tests that change or delete what they touch,
+    # so no test depends on another one having run (or not) before it.
+    def __init__(self):
+        self._numbers = itertools.count()
+
+    def _id(self, column, key_column, key):
+        with session.SessionLocal() as db:
+            found = db.query(column).filter(key_column == key).scalar()
+        assert found is not None, f"no seeded row with {key_column} = {key!r}"
+        return found
+
+    def item(self, sku: str) -> int:
+        return self._id(Item.id, Item.sku, sku)
+
+    def user(self, username: str) -> int:
+        return self._id(User.id, User.username, username)
+
+    def role(self, name: str) -> int:
+        return self._id(Role.id, Role.name, name)
+
+    def permission(self, name: str) -> int:
+        return self._id(Permission.id, Permission.name, name)
+
+    def _name(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._numbers)}"
+
+    def new_role(self, permission_names=()) -> int:
+        with session.SessionLocal() as db:
+            permissions = db.query(Permission).filter(Permission.name.in_(permission_names)).all()
+            role = Role(name=self._name("TEST_ROLE"), description="Test role", permissions=permissions)
+            db.add(role)
+            db.commit()
+            role_id = role.id
+        response_cache.invalidate("roles")
+        return role_id
+
+    def new_user(self, role_id: int) -> tuple[int, str]:
+        username = self._name("test_user")
+        with session.SessionLocal() as db:
+            user = User(
+                username=username,
+                email=f"{username}@company.com",
+                password=get_password_hash(PASSWORD),
+                role_id=role_id,
+            )
+            db.add(user)
+            db.commit()
+            user_id = user.id
+        response_cache.invalidate("users")
+        return user_id, username
+
+    def new_item(self, owner: str = "admin", quantity: int = 10) -> int:
+        owner_id = self.user(owner)
+        with session.SessionLocal() as db:
+            sku = self._name("TEST-ITEM")
+            item = Item(name=sku, description="Test item", sku=sku, quantity=quantity, owner_id=owner_id)
+            db.add(item)
+            db.commit()
+            item_id = item.id
+        response_cache.invalidate("items")
+        return item_id
+
+@pytest.fixture(scope="session")
+def rows(app):
+    return Rows()
+
+class QueryCounter:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def engines(self):
+        engines = [session.engine]
+        if session.async_engine is not None:
+            engines.append(session.async_engine.sync_engine)
+        engines += [getattr(engine, "sync_engine", engine) for engine in session.replicas.engines]
+        return engines
+
+    @contextmanager
+    def assert_max(self, budget: int, label: str = ""):
+        # Caches would hide the cold path the budget is meant to guard
+        permission_cache.clear()
+        token_version_cache.clear()
+        self.statements = []
+        for engine in self.engines():
+            event.listen(engine, "before_cursor_execute", self._record)
+        try:
+            yield self
+        finally:
+            for engine in self.engines():
+                event.remove(engine, "before_cursor_execute", self._record)
+
+        if len(self.statements) > budget:
+            listing = "\n".join(
+                f"  {number}. {' '.join(statement.split())}"
+                for number, statement in enumerate(self.statements, 1)
+            )
+            pytest.fail(
+                f"{label} ran {len(self.statements)} SQL statements, budget is {budget}:\n{listing}",
+                pytrace=False,
+            )
+
+@pytest.fixture
+def queries():
+    return QueryCounter()
@@ -0,0 +1,36 @@
+"""List and detail ETags: 304 on a match, a new tag once the body changes."""
+import pytest
+
+@pytest.mark.parametrize("url", [
+    "/api/items", "/api/items/{item}", "/api/roles", "/api/roles/{role}", "/api/permissions", "/api/permissions/{permission}",
+])
+def test_if_none_match_returns_304(client, admin_headers, rows, url):
+    url = url.format(item=rows.item("ADMIN-000"), role=rows.role("STAFF"), permission=rows.permission("item:view"))
+    response = client.get(url, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    etag = response.headers["ETag"]
+
+    response = client.get(url, headers={**admin_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+def test_item_list_etag_follows_updates(client, admin_headers, rows):
+    # The newest item is on the first page
+    item_id = rows.new_item()
+    before = client.get("/api/items?limit=50", headers=admin_headers).headers["ETag"]
+
+    response = client.put(f"/api/items/{item_id}", json={"name": "Renamed"}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    response = client.get("/api/items?limit=50", headers={**admin_headers, "If-None-Match": before})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != before
+
+def test_permission_etag_follows_updates(client, admin_headers, rows):
+    response = client.post("/api/permissions", json={"name": "etag:test", "description": "d"}, headers=admin_headers)
+    assert response.status_code == 201, response.text
+    permission_id = rows.permission("etag:test")
+
+    before = client.get(f"/api/permissions/{permission_id}", headers=admin_headers).headers["ETag"]
+    response = client.patch(f"/api/permissions/{permission_id}", json={"description": "Updated"}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert client.get(f"/api/permissions/{permission_id}", headers=admin_headers).headers["ETag"] != before
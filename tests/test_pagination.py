@@ -0,0 +1,29 @@
+"""Count defaults and the planner-estimate parameters."""
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg, psycopg2
+
+from app.crud.pagination import driver_params
+from app.models.item import Item
+
+def test_cursor_pages_are_not_counted_by_default(client, admin_headers):
+    first = client.get("/api/items", params={"limit": 5}, headers=admin_headers).json()
+    assert first["total"] is not None
+
+    seek = client.get("/api/items", params={"limit": 5, "cursor": first["next_cursor"]}, headers=admin_headers).json()
+    assert seek["total"] is None
+
+    counted = client.get(
+        "/api/items", params={"limit": 5, "cursor": first["next_cursor"], "count": "exact"}, headers=admin_headers
+    ).json()
+    assert counted["total"] == first["total"]
+
+def test_estimate_params_follow_the_driver_paramstyle():
+    stmt = select(Item.id).where(Item.owner_id == 7, Item.id < 40, Item.sku.in_(["A", "B"]))
+    compile_kwargs = {"render_postcompile": True}
+
+    compiled = stmt.compile(dialect=asyncpg.dialect(), compile_kwargs=compile_kwargs)
+    assert "$1" in str(compiled)
+    assert driver_params(compiled) == (7, 40, "A", "B")
+
+    compiled = stmt.compile(dialect=psycopg2.dialect(), compile_kwargs=compile_kwargs)
+    assert driver_params(compiled) == compiled.params
@@ -0,0 +1,69 @@
+"""Loads that race with an invalidation do not refill the auth caches.
+
+The write is simulated by invalidating the key while the loader's SELECT
+is running, i.e. after the loader read the key's generation.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.core.cache import TTLCache, permission_cache, token_version_cache
+from app.crud.role import get_role_permissions, warm_permission_cache
+from app.crud.user import get_user_token_version
+from app.db import session
+from app.models.rbac import Role
+from app.models.user import User
+
+@contextmanager
+def _invalidated_during_query(invalidate):
+    def on_execute(*args):
+        invalidate()
+
+    event.listen(session.engine, "before_cursor_execute", on_execute)
+    try:
+        yield
+    finally:
+        event.remove(session.engine, "before_cursor_execute", on_execute)
+
+@pytest.fixture
+def db(app):
+    permission_cache.clear()
+    token_version_cache.clear()
+    with session.SessionLocal() as db:
+        yield db
+
+def test_role_permissions_not_cached_across_invalidation(db):
+    role_id = db.query(Role.id).filter(Role.name == "STAFF").scalar()
+
+    with _invalidated_during_query(lambda: permission_cache.invalidate(role_id)):
+        get_role_permissions(db, role_id)
+    assert permission_cache.get(role_id) is None
+
+    get_role_permissions(db, role_id)
+    assert permission_cache.get(role_id) is not None
+
+def test_warm_cache_skipped_across_invalidation(db):
+    role_id = db.query(Role.id).filter(Role.name == "STAFF").scalar()
+
+    with _invalidated_during_query(lambda: permission_cache.invalidate(role_id)):
+        warm_permission_cache(db)
+    assert len(permission_cache) == 0
+
+def test_token_version_not_cached_across_invalidation(db):
+    user_id = db.query(User.id).filter(User.username == "staff_joko").scalar()
+
+    with _invalidated_during_query(lambda: token_version_cache.invalidate(user_id)):
+        get_user_token_version(db, user_id)
+    assert token_version_cache.get(user_id) is None
+
+    get_user_token_version(db, user_id)
+    assert token_version_cache.get(user_id) is not None
+
+def test_generations_move_forward_after_clear():
+    cache = TTLCache(maxsize=2)
+    generation = cache.generation("a")
+    cache.invalidate("a")
+    cache.clear()
+    assert not cache.set("a", 1, generation=generation)
+    assert cache.set("a", 1, generation=cache.generation("a"))
@@ -0,0 +1,129 @@
+"""SQL statement budgets per endpoint.
+
+Each call runs with a cold permission cache and must stay within its
+budget; a failure lists every statement the request issued. Budgets are
+fixed numbers, not per-row costs, so an N+1 over the seeded rows (several
+users, roles and items per page) blows through them.
+
+Reads and login run with plain tokens and with permission-bearing tokens
+(ACCESS_TOKEN_EMBED_PERMISSIONS); writes never authorize from the token.
+"""
+import pytest
+
+from app.core.config import settings
+
+READ_BUDGETS = [
+    # (url, budget, role); {item}, {user}, {role} and {permission} are
+    # seeded rows looked up by natural key
+    ("/api/items", 3, "admin"),
+    ("/api/items?search=widget", 3, "admin"),
+    ("/api/items?cursor=20&limit=5", 3, "admin"),
+    ("/api/items?cursor=20&limit=5&count=exact", 4, "admin"),
+    ("/api/items?count=none", 3, "admin"),
+    ("/api/items", 3, "staff"),
+    ("/api/items/{item}", 3, "admin"),
+    ("/api/items/{item}/movements", 4, "admin"),
+    ("/api/items/export?format=csv", 3, "admin"),
+    ("/api/items/export?format=ndjson", 3, "staff"),
+    ("/api/users", 5, "admin"),
+    ("/api/users?search=user", 5, "admin"),
+    ("/api/users?view=compact", 3, "admin"),
+    ("/api/users/{user}", 5, "admin"),
+    ("/api/users/me", 1, "staff"),
+    ("/api/roles", 4, "admin"),
+    ("/api/roles/{role}", 4, "admin"),
+    ("/api/permissions", 3, "admin"),
+    ("/api/permissions?limit=5", 3, "admin"),
+    ("/api/permissions/{permission}", 3, "admin"),
+]
+
+@pytest.fixture(scope="module", params=[False, True], ids=["plain-token", "embedded-permissions"])
+def embed_permissions(request):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(settings, "ACCESS_TOKEN_EMBED_PERMISSIONS", request.param)
+        yield request.param
+
+@pytest.fixture(scope="module")
+def headers(login, embed_permissions):
+    return {"admin": login("admin"), "staff": login("staff_joko")}
+
+@pytest.fixture(scope="module")
+def seeded_ids(rows):
+    return {
+        "item": rows.item("ADMIN-000"),
+        "user": rows.user("user_1"),
+        "role": rows.role("STAFF"),
+        "permission": rows.permission("item:view_all"),
+    }
+
+@pytest.mark.parametrize("url, budget, role", READ_BUDGETS)
+def test_read_query_budget(client, headers, queries, seeded_ids, url, budget, role):
+    url = url.format(**seeded_ids)
+    with queries.assert_max(budget, f"GET {url}"):
+        response = client.get(url, headers=headers[role])
+    assert response.status_code == 200, response.text
+
+def test_create_item_query_budget(client, admin_headers, queries):
+    item = {"name": "Budget item", "description": "d", "sku": "BUDGET-CREATE", "quantity": 3}
+    with queries.assert_max(5, "POST /api/items"):
+        response = client.post("/api/items", json=item, headers=admin_headers)
+    assert response.status_code == 201, response.text
+
+def test_update_item_query_budget(client, admin_headers, queries, rows):
+    item_id = rows.new_item()
+    with queries.assert_max(7, "PUT /api/items/{id}"):
+        response = client.put(f"/api/items/{item_id}", json={"quantity": 12}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+def test_adjust_item_query_budget(client, admin_headers, queries, rows):
+    item_id = rows.new_item()
+    with queries.assert_max(4, "POST /api/items/{id}/adjust"):
+        response = client.post(f"/api/items/{item_id}/adjust", json={"delta": -1}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+def test_batch_movements_query_budget(client, admin_headers, queries, rows):
+    batch = {"movements": [{"item_id": rows.new_item(), "delta": 1} for _ in range(10)]}
+    with queries.assert_max(4, "POST /api/items/movements"):
+        response = client.post("/api/items/movements", json=batch, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+def _item_csv(sku_prefix: str, quantity_offset: int = 0):
+    lines = "\n".join(
+        f"Imported {index},d,{sku_prefix}-{index:03d},{index + quantity_offset}" for index in range(50)
+    )
+    return ("items.csv", f"name,description,sku,quantity\n{lines}\n", "text/csv")
+
+def test_import_items_query_budget(client, admin_headers, queries):
+    with queries.assert_max(4, "POST /api/items/import"):
+        response = client.post("/api/items/import", files={"file": _item_csv("IMPORT")}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"] == 50
+
+def test_reimport_items_query_budget(client, admin_headers, queries):
+    response = client.post("/api/items/import", files={"file": _item_csv("REIMPORT")}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    with queries.assert_max(6, "POST /api/items/import (existing SKUs)"):
+        response = client.post("/api/items/import", files={"file": _item_csv("REIMPORT", 1)}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"] == 50
+
+def test_delete_item_query_budget(client, admin_headers, queries, rows):
+    item_id = rows.new_item()
+    with queries.assert_max(5, "DELETE /api/items/{id}"):
+        response = client.delete(f"/api/items/{item_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+def test_sync_role_permissions_query_budget(client, admin_headers, queries, rows):
+    role_id = rows.new_role(["item:view", "item:create", "role:view"])
+    names = ["item:view_all", "item:view", "item:update", "item:delete", "role:view",
+             "role:create", "user:view", "user:view_all", "permission:view", "permission:view_all"]
+    body = {"permission_ids": [rows.permission(name) for name in names]}
+    with queries.assert_max(11, "PUT /api/roles/{id}/permissions"):
+        response = client.put(f"/api/roles/{role_id}/permissions", json=body, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+def test_login_query_budget(client, queries, embed_permissions):
+    with queries.assert_max(1, "POST /api/auth/login"):
+        response = client.post("/api/auth/login", data={"username": "user_1", "password": "password123"})
+    assert response.status_code == 200, response.text
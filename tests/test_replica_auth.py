@@ -0,0 +1,74 @@
+"""Authorization against a lagging read replica.
+
+The replica is a copy of the test database taken before the change under
+test, so it still has the old grant; SQLite only.
+"""
+import asyncio
+import sqlite3
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from app.core.cache import permission_cache
+from app.core.config import to_async_url
+from app.db import session
+from app.dependencies import PermissionChecker
+from app.schemas.token import TokenData
+
+pytestmark = pytest.mark.skipif(
+    session.engine.dialect.name != "sqlite", reason="copies the SQLite database file"
+)
+
+@pytest.fixture
+def lagging_replica(app, tmp_path):
+    def snapshot() -> str:
+        path = tmp_path / "replica.db"
+        with sqlite3.connect(session.engine.url.database) as source, sqlite3.connect(path) as target:
+            source.backup(target)
+        return f"sqlite:///{path}"
+    return snapshot
+
+def _check(method: str, username: str, replica_url: str, permission: str) -> None:
+    async def run():
+        if session.AsyncSessionLocal is not None:
+            replica_engine = create_async_engine(to_async_url(replica_url))
+            async with session.AsyncSessionLocal() as db, session.AsyncSessionLocal(bind=replica_engine) as read_db:
+                await checker(request, db=db, read_db=read_db, token_data=token_data)
+            await replica_engine.dispose()
+        else:
+            replica_engine = create_engine(replica_url)
+            with session.SessionLocal() as db, session.SessionLocal(bind=replica_engine) as read_db:
+                await checker(request, db=db, read_db=read_db, token_data=token_data)
+            replica_engine.dispose()
+
+    checker = PermissionChecker(permission)
+    request = Request({"type": "http", "method": method, "headers": []})
+    token_data = TokenData(username=username)
+    asyncio.run(run())
+
+def test_revoked_grant_is_not_cached_from_replica(client, admin_headers, rows, lagging_replica):
+    role_id = rows.new_role(["role:view"])
+    _, username = rows.new_user(role_id)
+    replica_url = lagging_replica()
+
+    response = client.put(f"/api/roles/{role_id}/permissions", json={"permission_ids": []}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    with pytest.raises(HTTPException) as raised:
+        _check("GET", username, replica_url, "role:view")
+    assert raised.value.status_code == 403
+    assert "role:view" not in permission_cache.get(role_id).names
+
+def test_write_authorizes_against_primary(client, admin_headers, rows, lagging_replica):
+    user_id, username = rows.new_user(rows.new_role(["role:create"]))
+    replica_url = lagging_replica()
+
+    response = client.post(f"/api/roles/{rows.new_role()}/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    with pytest.raises(HTTPException) as raised:
+        _check("POST", username, replica_url, "role:create")
+    assert raised.value.status_code == 403
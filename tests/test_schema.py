@@ -0,0 +1,76 @@
+"""Upgrading a database created by an earlier release (python -m app.db.schema)."""
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from sqlalchemy.orm import Session
+
+from app.crud import item as crud_item
+from app.crud import permission as crud_permission
+from app.crud import role as crud_role
+from app.db.migrations import LATEST_VERSION
+from app.db.schema import recorded_version, upgrade_schema
+
+# The tables as the first release created them, plus the stock ledger as
+# user-012 first shipped it
+BASELINE_DDL = [
+    "CREATE TABLE roles (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL UNIQUE, description VARCHAR)",
+    "CREATE TABLE permissions (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL UNIQUE, description VARCHAR)",
+    "CREATE TABLE role_permission ("
+    " role_id INTEGER REFERENCES roles (id) ON DELETE CASCADE,"
+    " permission_id INTEGER REFERENCES permissions (id) ON DELETE CASCADE,"
+    " PRIMARY KEY (role_id, permission_id))",
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR NOT NULL UNIQUE, password VARCHAR NOT NULL,"
+    " email VARCHAR NOT NULL UNIQUE, role_id INTEGER REFERENCES roles (id) ON DELETE CASCADE)",
+    "CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, description VARCHAR NOT NULL,"
+    " sku VARCHAR UNIQUE, quantity INTEGER, owner_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE)",
+    "CREATE TABLE stock_movements (id INTEGER PRIMARY KEY,"
+    " item_id INTEGER NOT NULL REFERENCES items (id) ON DELETE CASCADE, delta INTEGER NOT NULL,"
+    " quantity_after INTEGER NOT NULL, reason VARCHAR, created_by INTEGER REFERENCES users (id) ON DELETE SET NULL,"
+    " created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)",
+    "INSERT INTO roles (id, name) VALUES (1, 'ADMIN')",
+    "INSERT INTO users (id, username, password, email, role_id) VALUES (1, 'old', 'x', 'old@example.com', 1)",
+    "INSERT INTO items (id, name, description, sku, quantity, owner_id) VALUES (1, 'Old', 'd', 'OLD-1', 3, 1)",
+    "INSERT INTO stock_movements (item_id, delta, quantity_after) VALUES (1, 3, 3)",
+]
+
+@pytest.fixture
+def baseline_engine():
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'baseline.db')}")
+    with engine.begin() as connection:
+        for statement in BASELINE_DDL:
+            connection.execute(text(statement))
+    yield engine
+    engine.dispose()
+
+def test_upgrade_existing_database(baseline_engine):
+    applied = upgrade_schema(baseline_engine)
+    assert [migration.version for migration in applied] == list(range(1, LATEST_VERSION + 1))
+
+    with baseline_engine.connect() as connection:
+        assert recorded_version(connection) == LATEST_VERSION
+        assert connection.execute(text("SELECT token_version FROM users")).scalar() == 1
+        assert connection.execute(text("SELECT permissions_version FROM roles")).scalar() == 1
+        assert connection.execute(text("SELECT sku FROM stock_movements")).scalar() == "OLD-1"
+
+    # Nothing left to do the second time
+    assert upgrade_schema(baseline_engine) == []
+
+def test_upgraded_database_serves_pages(baseline_engine):
+    upgrade_schema(baseline_engine)
+    with Session(baseline_engine) as db:
+        items, total = crud_item.get_items_page(db)
+        assert total == 1 and items[0]["version"] == 1
+        roles, _ = crud_role.get_roles_page(db)
+        assert roles[0].version == 1
+        assert crud_permission.get_permissions_page(db) == ([], 0)
+
+def test_fresh_database_is_stamped():
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'fresh.db')}")
+    assert upgrade_schema(engine) == []
+    with engine.connect() as connection:
+        assert recorded_version(connection) == LATEST_VERSION
+        assert inspect(connection).has_table("stock_movements")
+    engine.dispose()
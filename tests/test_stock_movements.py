@@ -0,0 +1,49 @@
+"""The stock movement ledger agrees with items.quantity after every kind of write."""
+from sqlalchemy import func
+
+from app.db import session
+from app.models.item import Item
+from app.models.stock_movement import StockMovement
+
+def _quantity_and_ledger(sku: str) -> tuple[int, int, int]:
+    with session.SessionLocal() as db:
+        item_id, quantity = db.query(Item.id, Item.quantity).filter(Item.sku == sku).one()
+        ledger = db.query(func.coalesce(func.sum(StockMovement.delta), 0)).filter(
+            StockMovement.item_id == item_id
+        ).scalar()
+    return item_id, quantity, ledger
+
+def _import(client, headers, sku: str, quantity: int):
+    upload = ("items.csv", f"name,description,sku,quantity\nLedger,d,{sku},{quantity}\n", "text/csv")
+    response = client.post("/api/items/import", files={"file": upload}, headers=headers)
+    assert response.status_code == 200, response.text
+
+def test_ledger_matches_quantity(client, admin_headers):
+    _import(client, admin_headers, "LEDGER-001", 5)
+    item_id, quantity, ledger = _quantity_and_ledger("LEDGER-001")
+    assert (quantity, ledger) == (5, 5)
+
+    _import(client, admin_headers, "LEDGER-001", 9)
+    assert _quantity_and_ledger("LEDGER-001")[1:] == (9, 9)
+
+    response = client.post(f"/api/items/{item_id}/adjust", json={"delta": -2}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    response = client.put(f"/api/items/{item_id}", json={"quantity": 20}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert _quantity_and_ledger("LEDGER-001")[1:] == (20, 20)
+
+def test_deleting_an_item_keeps_its_history(client, admin_headers):
+    _import(client, admin_headers, "LEDGER-002", 4)
+    _import(client, admin_headers, "LEDGER-002", 7)
+    item_id, _, ledger = _quantity_and_ledger("LEDGER-002")
+    before = client.get(f"/api/items/{item_id}/movements", headers=admin_headers).json()["movements"]
+    assert sum(movement["delta"] for movement in before) == ledger
+
+    response = client.delete(f"/api/items/{item_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    response = client.get(f"/api/items/{item_id}/movements", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    after = response.json()["movements"]
+    assert after == before
+    assert {(movement["item_id"], movement["sku"]) for movement in after} == {(item_id, "LEDGER-002")}
@@ -0,0 +1,31 @@
+"""Tokens that embed permissions stop being trusted once the user changes.
+
+With ACCESS_TOKEN_EMBED_PERMISSIONS, safe-method requests authorize from
+the token's claims; reassigning or deleting the user must revoke them
+right away, not when the token expires.
+"""
+import pytest
+
+from app.core.config import settings
+
+@pytest.fixture
+def embed_permissions(monkeypatch):
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_EMBED_PERMISSIONS", True)
+
+def test_reassigned_user_loses_embedded_permissions(client, admin_headers, login, rows, embed_permissions):
+    user_id, username = rows.new_user(rows.role("ADMIN"))
+    headers = login(username)
+    assert client.get("/api/roles", headers=headers).status_code == 200
+
+    response = client.post(f"/api/roles/{rows.role('STAFF')}/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert client.get("/api/roles", headers=headers).status_code == 403
+
+def test_deleted_user_loses_embedded_permissions(client, admin_headers, login, rows, embed_permissions):
+    user_id, username = rows.new_user(rows.role("ADMIN"))
+    headers = login(username)
+    assert client.get("/api/roles", headers=headers).status_code == 200
+
+    response = client.delete(f"/api/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert client.get("/api/roles", headers=headers).status_code == 401